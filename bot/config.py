@@ -1,9 +1,34 @@
+from functools import lru_cache
 from pathlib import Path
 import logging
 import json
+import os
+
+try:
+    # orjson is an optional, much faster drop-in for (de)serializing settings.json
+    import orjson
+
+    json_loads = orjson.loads
+
+    def json_dumps(obj) -> bytes:
+        """Serialize *obj* as indented UTF-8 JSON."""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    json_loads = json.loads
+
+    def json_dumps(obj) -> bytes:
+        """Serialize *obj* as indented UTF-8 JSON."""
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
 
 logger = logging.getLogger(__name__)
 
+# Resolved once at import: Path.resolve() costs a readlink/stat per component
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Labels recognised after the token in the conf file (compared case-insensitively)
+_SANDBOX_LABELS = frozenset({"песочница", "sandbox"})
+_PROD_LABELS = frozenset({"прод", "prod"})
+
 
 class Settings:
     """Load tokens from a text file named ``conf`` that resides in the project root
@@ -16,49 +41,74 @@ class Settings:
     where *label* is either ``песочница`` (sandbox) or ``прод`` (production).
     """
 
+    __slots__ = ("settings_file", "sandbox_token", "production_token", "_conf_path")
+
+    # Existence of the token files, including misses. Both files are only
+    # rewritten by the Settings tab, which calls :meth:`invalidate` afterwards.
+    _exists_cache: dict[Path, bool] = {}
+
     def __init__(self, conf_path: Path | str | None = None) -> None:
         # Try to load from settings.json first
-        self.settings_file = Path(__file__).resolve().parent.parent / "settings.json"
+        self.settings_file = PROJECT_ROOT / "settings.json"
         self.sandbox_token: str | None = None
         self.production_token: str | None = None
         
         # Try to load from settings.json first
-        if self.settings_file.exists():
+        if self._cached_exists(self.settings_file):
             try:
-                settings_data = json.loads(self.settings_file.read_text(encoding="utf-8"))
+                settings_data = json_loads(self.settings_file.read_bytes())
                 self.sandbox_token = settings_data.get("sandbox_token")
                 self.production_token = settings_data.get("production_token")
                 logger.info("Loaded tokens from settings.json")
             except Exception as e:
                 logger.warning("Failed to load tokens from settings.json: %s", e)
         
-        # If no token was loaded from settings.json, try the conf file
-        if not self.sandbox_token:
-            if conf_path is None:
-                # The conf file is expected to be located two levels above: project_root/conf
-                conf_path = Path(__file__).resolve().parent.parent / "conf"
-            self._conf_path = Path(conf_path)
-            if not self._conf_path.exists():
-                raise FileNotFoundError(
-                    f"Configuration file '{self._conf_path}' not found. "
-                    "Create it and put your Tinkoff tokens there, or configure tokens in the Settings tab."
-                )
+        # Fast path: settings.json already provided the token, skip the conf file entirely
+        if self.sandbox_token:
+            return
+
+        if conf_path is None:
+            # The conf file is expected to be located two levels above: project_root/conf
+            conf_path = PROJECT_ROOT / "conf"
+        self._conf_path = Path(conf_path)
+        # Open the file directly instead of probing it first: one syscall
+        # less and no stale stat() results on network filesystems.
+        try:
+            if self._exists_cache.get(self._conf_path) is False:
+                raise FileNotFoundError(self._conf_path)
             self._parse_file()
+        except FileNotFoundError:
+            self._exists_cache[self._conf_path] = False
+            raise FileNotFoundError(
+                f"Configuration file '{self._conf_path}' not found. "
+                "Create it and put your Tinkoff tokens there, or configure tokens in the Settings tab."
+            ) from None
 
     # ---------------------------------------------------------------------
     # Internal helpers
     # ---------------------------------------------------------------------
+    @classmethod
+    def _cached_exists(cls, path: Path) -> bool:
+        try:
+            return cls._exists_cache[path]
+        except KeyError:
+            # access(F_OK) is cheaper than the full stat() behind Path.exists()
+            exists = cls._exists_cache[path] = os.access(path, os.F_OK)
+            return exists
+
     def _parse_file(self) -> None:
-        for line in self._conf_path.read_text(encoding="utf-8").splitlines():
-            parts = line.strip().split()
-            if not parts:
-                continue
-            token, *label_parts = parts
-            label = " ".join(label_parts).lower() if label_parts else ""
-            if "песочница" in label or "sandbox" in label:
-                self.sandbox_token = token
-            elif "прод" in label or "prod" in label:
-                self.production_token = token
+        # Stream the file line by line instead of materializing it with splitlines()
+        with open(self._conf_path, "r", encoding="utf-8", buffering=65536) as f:
+            for line in f:
+                parts = line.split()
+                if not parts:
+                    continue
+                token, *label_parts = parts
+                labels = {part.casefold() for part in label_parts}
+                if not labels.isdisjoint(_SANDBOX_LABELS):
+                    self.sandbox_token = token
+                elif not labels.isdisjoint(_PROD_LABELS):
+                    self.production_token = token
 
         if self.sandbox_token is None:
             raise ValueError(
@@ -69,11 +119,32 @@ class Settings:
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
+    @classmethod
+    def invalidate(cls, path: Path | str | None = None) -> None:
+        """Forget cached existence of *path* (or of every file if omitted)."""
+        if path is None:
+            cls._exists_cache.clear()
+        else:
+            cls._exists_cache.pop(Path(path), None)
+
     @property
     def token(self) -> str:
         """Return the sandbox token (for this MVP we always work in sandbox)."""
         return self.sandbox_token  # type: ignore[return-value]
 
 
-# Initialize global settings instance
-settings = Settings() 
\ No newline at end of file
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the process-wide :class:`Settings` instance, loading it on first use.
+
+    Call ``get_settings.cache_clear()`` after the token files change on disk.
+    """
+    return Settings()
+
+
+def __getattr__(name: str):
+    # Keep ``from bot.config import settings`` working without reading the
+    # token files at import time.
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,43 +1,68 @@
 from __future__ import annotations
 
 import logging
-from typing import AsyncIterator, AsyncContextManager
-
-from tinkoff.invest import (
-    AsyncClient,
-    CandleInterval,
-    CandleInstrument,
-    MarketDataRequest,
-    OrderDirection,
-    OrderType,
-    SubscriptionAction,
-    SubscribeCandlesRequest,
-)
-from tinkoff.invest.constants import INVEST_GRPC_API_SANDBOX
-
-from bot.config import settings
+from functools import partial
+from types import ModuleType
+from typing import TYPE_CHECKING, AsyncIterator, AsyncContextManager
+
+from bot.config import get_settings
+
+if TYPE_CHECKING:
+    from tinkoff.invest import AsyncClient, CandleInterval
 
 logger = logging.getLogger(__name__)
 
+# Member names of tinkoff.invest.OrderDirection, resolved once the SDK is loaded
+_DIRECTIONS = {
+    "buy": "ORDER_DIRECTION_BUY",
+    "sell": "ORDER_DIRECTION_SELL",
+}
+
+_sdk: ModuleType | None = None
+
+
+def _invest() -> ModuleType:
+    """Import ``tinkoff.invest`` on first use.
+
+    The SDK drags in grpc and protobuf, which dominates start-up of code paths
+    that never talk to the API (CLI ``--help``, settings, test collection).
+    """
+    global _sdk
+    if _sdk is None:
+        import tinkoff.invest
+        import tinkoff.invest.constants
+
+        _sdk = tinkoff.invest
+    return _sdk
+
 
 class InvestClient:
     """Lightweight asynchronous wrapper around tinkoff-invest-python AsyncClient."""
 
-    def __init__(self) -> None:
-        self._token: str = settings.token
+    __slots__ = ("_token", "_new_client", "_client", "_services", "_account_id")
+
+    def __init__(self, token: str | None = None) -> None:
+        self._token: str = token or get_settings().token
+        # Connection arguments are fixed per instance; bind them once
+        sdk = _invest()
+        self._new_client = partial(
+            sdk.AsyncClient, token=self._token, target=sdk.constants.INVEST_GRPC_API_SANDBOX
+        )
         self._client: AsyncClient | None = None
+        self._account_id: str | None = None
 
     # ------------------------------------------------------------------
     # Async context manager helpers
     # ------------------------------------------------------------------
     async def __aenter__(self) -> "InvestClient":
         logger.debug("Opening connection to Tinkoff Invest API (sandbox mode)")
-        self._client = AsyncClient(token=self._token, target=INVEST_GRPC_API_SANDBOX)
+        self._client = self._new_client()
         self._services = await self._client.__aenter__()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:  # noqa: D401
         logger.debug("Closing connection to Tinkoff Invest API")
+        self._account_id = None
         if self._client is not None:
             await self._client.__aexit__(exc_type, exc_val, exc_tb)
 
@@ -45,23 +70,35 @@ class InvestClient:
     # Public helpers
     # ------------------------------------------------------------------
     async def account_id(self) -> str:
+        """Return the sandbox account id, resolving it once per session."""
         assert self._client is not None
-        resp = await self._services.sandbox.get_sandbox_accounts()
-        if not resp.accounts:
-            opened = await self._services.sandbox.open_sandbox_account()
-            return opened.account_id
-        return resp.accounts[0].id
+        if self._account_id is None:
+            resp = await self._services.sandbox.get_sandbox_accounts()
+            if not resp.accounts:
+                opened = await self._services.sandbox.open_sandbox_account()
+                self._account_id = opened.account_id
+            else:
+                self._account_id = resp.accounts[0].id
+        return self._account_id
+
+    def reset_account(self) -> None:
+        """Forget the memoized account id so the next order looks it up again."""
+        self._account_id = None
 
     async def place_market_order(self, figi: str, qty: int, direction: str) -> None:
         """Send a simple market order in the given *direction* (buy/sell)."""
         assert self._client is not None, "Client not initialized. Use 'async with InvestClient()'."
-        direction_enum = OrderDirection.BUY if direction.lower() == "buy" else OrderDirection.SELL
+        try:
+            direction_name = _DIRECTIONS[direction.lower()]
+        except KeyError:
+            raise ValueError(f"Unknown order direction: {direction!r}") from None
+        sdk = _invest()
         account_id = await self.account_id()
         await self._services.sandbox.post_sandbox_order(
             figi=figi,
             quantity=qty,
-            direction=direction_enum,
-            order_type=OrderType.MARKET,
+            direction=sdk.OrderDirection[direction_name],
+            order_type=sdk.OrderType.ORDER_TYPE_MARKET,
             account_id=account_id,
         )
         logger.info("%s %s @MKT", direction.upper(), figi)
@@ -69,22 +106,29 @@ class InvestClient:
     async def stream_candles(
         self,
         figi: str,
-        interval: CandleInterval = CandleInterval.CANDLE_INTERVAL_1_MIN,
+        interval: CandleInterval | None = None,
     ) -> tuple[AsyncContextManager, AsyncIterator]:
         """
         Creates and returns a stream manager and an async iterator for candles.
         This allows for graceful stream termination.
+
+        *interval* defaults to one-minute candles.
         """
         assert self._client is not None, "Client not initialized. Use 'async with InvestClient()'."
+        sdk = _invest()
+        if interval is None:
+            interval = sdk.CandleInterval.CANDLE_INTERVAL_1_MIN
 
         stream_mgr = self._services.create_market_data_stream()
         stream_mgr.candles.subscribe(
-            [CandleInstrument(figi=figi, interval=interval)]
+            [sdk.CandleInstrument(figi=figi, interval=interval)]
         )
 
         async def candle_iterator() -> AsyncIterator:
+            # The stream is subscribed to a single FIGI, so no per-message figi filter
             async for marketdata in stream_mgr:
-                if marketdata.candle and marketdata.candle.figi == figi:
-                    yield marketdata.candle
+                candle = marketdata.candle
+                if candle is not None:
+                    yield candle
 
         return stream_mgr, candle_iterator() 
\ No newline at end of file
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+
+def put_drop_oldest(queue: asyncio.Queue, item: Any) -> None:
+    """Put *item* without waiting, discarding the oldest queued item if *queue* is full.
+
+    Keeps the producer (the market-data stream) from ever blocking on a slow
+    consumer: under overload the consumer sees the freshest data, not a backlog.
+    """
+    try:
+        queue.put_nowait(item)
+    except asyncio.QueueFull:
+        queue.get_nowait()
+        queue.put_nowait(item)
+
+
+class AsyncBatcher:
+    """Async iterator that groups items from *queue* into lists.
+
+    A batch is returned once it holds *max_items* items or *timeout* seconds
+    after its first item arrived, whichever comes first. Items already waiting
+    in the queue are taken without suspending.
+
+    With the default *timeout* of 0 the batcher is greedy: a batch is whatever
+    has queued up by the time the first item is taken, so a lone item is
+    returned at once and only bursts are grouped.
+    """
+
+    __slots__ = ("_queue", "_max_items", "_timeout")
+
+    def __init__(self, queue: asyncio.Queue, max_items: int = 32, timeout: float = 0.0) -> None:
+        self._queue = queue
+        self._max_items = max_items
+        self._timeout = timeout
+
+    def __aiter__(self) -> "AsyncBatcher":
+        return self
+
+    async def __anext__(self) -> list:
+        queue = self._queue
+        batch = [await queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self._timeout
+        while len(batch) < self._max_items:
+            try:
+                batch.append(queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
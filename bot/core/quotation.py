@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from typing import Any
+
+
+def quotation_to_float(q: Any) -> float:
+    """Convert a Tinkoff ``Quotation``/``MoneyValue`` (units + nano) to ``float``.
+
+    Cheaper than ``float(quotation_to_decimal(q))`` on hot paths: no intermediate
+    ``Decimal`` is built and ``tinkoff.invest.utils`` is not imported.
+    """
+    return q.units + q.nano / 1_000_000_000
+
+
+def quotation_to_nano(q: Any) -> int:
+    """Convert a ``Quotation``/``MoneyValue`` to an exact integer count of 1e-9 units.
+
+    Sums and comparisons of such values are exact, unlike their ``float`` form.
+    """
+    return q.units * 1_000_000_000 + q.nano
@@ -0,0 +1,113 @@
+"""Simple-moving-average kernels shared by the chart and SmaCrossStrategy.
+
+numba is optional: when it is installed the loop kernels are JIT-compiled,
+otherwise equivalent NumPy implementations are used.
+
+* :func:`bulk_sma` computes the SMA over a whole array of float closes in one
+  pass (chart history loading).
+* :func:`crossovers` finds fast/slow SMA crossovers for
+  ``SmaCrossStrategy.on_history``. Closes are integer nano-units (int64), so
+  window sums are exact and the averages are compared without division; both
+  implementations and ``SmaCrossStrategy.on_candle`` therefore find exactly the
+  same crossovers. Sums fit in int64 while slow * price < 9.2e9 units (e.g.
+  500 candles at prices up to 18 million).
+"""
+from __future__ import annotations
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:  # numba is optional: the NumPy variants below are used instead
+    numba = None
+
+
+def _rolling_sums(closes, period):
+    """Window sums of *period* closes, updated incrementally; NaN until the window fills."""
+    out = np.empty(closes.shape[0], dtype=np.float64)
+    acc = 0.0
+    for i in range(closes.shape[0]):
+        acc += closes[i]
+        if i >= period:
+            acc -= closes[i - period]
+        out[i] = acc if i >= period - 1 else np.nan
+    return out
+
+
+def _rolling_sums_numpy(closes, period):
+    """Same as :func:`_rolling_sums`, via a cumulative sum."""
+    out = np.full(closes.shape[0], np.nan)
+    if closes.shape[0] >= period:
+        csum = np.cumsum(closes)
+        out[period - 1] = csum[period - 1]
+        out[period:] = csum[period:] - csum[:-period]
+    return out
+
+
+def _scan(closes, fast, slow, first, prev_sign):
+    """Find fast/slow SMA crossovers in int64 *closes*, starting at index *first*.
+
+    *first* must be at least ``slow - 1``; *prev_sign* is the sign of the last
+    crossover before *first* (0 if there was none). Returns the indices where
+    the sign of ``fast_ma - slow_ma`` changed and the new signs.
+    """
+    n = closes.shape[0]
+    indices = np.empty(n, dtype=np.int64)
+    signs = np.empty(n, dtype=np.int8)
+    k = 0
+    fast_sum = 0
+    slow_sum = 0
+    for i in range(n):
+        if i >= fast:
+            fast_sum -= closes[i - fast]
+        if i >= slow:
+            slow_sum -= closes[i - slow]
+        fast_sum += closes[i]
+        slow_sum += closes[i]
+        if i < first:
+            continue
+        # fast_sum / fast vs slow_sum / slow: integer parts first, then the
+        # remainders; cross-multiplying the sums could overflow int64
+        fast_q = fast_sum // fast
+        slow_q = slow_sum // slow
+        if fast_q != slow_q:
+            sign = 1 if fast_q > slow_q else -1
+        else:
+            diff = (fast_sum - fast_q * fast) * slow - (slow_sum - slow_q * slow) * fast
+            if diff == 0:
+                continue
+            sign = 1 if diff > 0 else -1
+        if sign != prev_sign:
+            indices[k] = i
+            signs[k] = sign
+            k += 1
+            prev_sign = sign
+    return indices[:k], signs[:k]
+
+
+def _scan_numpy(closes, fast, slow, first, prev_sign):
+    """Same as :func:`_scan`, via NumPy convolutions."""
+    fast_sum = np.convolve(closes, np.ones(fast, dtype=np.int64), "valid")[first - fast + 1:]
+    slow_sum = np.convolve(closes, np.ones(slow, dtype=np.int64), "valid")[first - slow + 1:]
+    fast_q, fast_r = np.divmod(fast_sum, fast)
+    slow_q, slow_r = np.divmod(slow_sum, slow)
+    signs = np.where(fast_q != slow_q, np.sign(fast_q - slow_q), np.sign(fast_r * slow - slow_r * fast))
+    signs = signs.astype(np.int8)
+    nonzero = np.flatnonzero(signs)
+    nonzero_signs = signs[nonzero]
+    # A crossover is a non-zero sign that differs from the previous non-zero one
+    changed = nonzero_signs != np.concatenate(([prev_sign], nonzero_signs[:-1]))
+    return nonzero[changed] + first, nonzero_signs[changed]
+
+
+if numba is not None:
+    rolling_sums = numba.njit(cache=True)(_rolling_sums)
+    crossovers = numba.njit(cache=True)(_scan)
+else:
+    rolling_sums = _rolling_sums_numpy
+    crossovers = _scan_numpy
+
+
+def bulk_sma(closes: np.ndarray, period: int) -> np.ndarray:
+    """SMA of *period* over the whole *closes* array in one pass; NaN until the window fills."""
+    return rolling_sums(np.ascontiguousarray(closes, dtype=np.float64), period) / period
@@ -1,14 +1,21 @@
 from __future__ import annotations
 
-import pandas as pd
+import collections
+import math
+
+import numpy as np
 import pyqtgraph as pg
 import datetime
-from typing import Dict, Any, List
+from typing import TYPE_CHECKING, Dict, Any, Iterable, List, Sequence, Tuple
 from PyQt6.QtWidgets import QGridLayout, QWidget, QLabel, QVBoxLayout, QFrame
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QFont
-from tinkoff.invest.schemas import Candle
-from tinkoff.invest.utils import quotation_to_decimal
+from PyQt6.QtCore import QLineF, QRectF, Qt, QTimer
+from PyQt6.QtGui import QFont, QPainter, QPicture
+
+from bot.core.quotation import quotation_to_float
+from bot.core.sma import bulk_sma
+
+if TYPE_CHECKING:
+    from tinkoff.invest.schemas import Candle
 
 
 class TradeInfoWidget(QFrame):
@@ -17,7 +24,12 @@ class TradeInfoWidget(QFrame):
     def __init__(self):
         super().__init__()
         self.setFrameShape(QFrame.Shape.StyledPanel)
-        self.setStyleSheet("background-color: rgba(18, 18, 18, 0.7); color: #ccc; border-radius: 5px;")
+        # Таблица стилей задаётся один раз; цвет прибыли переключается свойством "profit"
+        self.setStyleSheet(
+            "* { background-color: rgba(18, 18, 18, 0.7); color: #ccc; border-radius: 5px; }"
+            'QLabel[profit="pos"] { color: #26a69a; }'
+            'QLabel[profit="neg"] { color: #ef5350; }'
+        )
         
         layout = QVBoxLayout(self)
         layout.setContentsMargins(10, 10, 10, 10)
@@ -33,6 +45,7 @@ class TradeInfoWidget(QFrame):
         self.win_rate_label = QLabel("Винрейт: 0%")
         self.win_sum_label = QLabel("Сумма выигрышей: 0.00")
         self.last_trade_label = QLabel("Последняя сделка: -")
+        self.win_sum_label.setProperty("profit", "pos")
         
         layout.addWidget(self.profit_label)
         layout.addWidget(self.trades_label)
@@ -48,7 +61,7 @@ class TradeInfoWidget(QFrame):
                      win_sum: float = 0.0):
         """Обновляет статистику торговли."""
         self.profit_label.setText(f"Прибыль: {total_profit:.2f}")
-        self.profit_label.setStyleSheet(f"color: {'#26a69a' if total_profit >= 0 else '#ef5350'};")
+        self._set_profit_color(self.profit_label, total_profit)
         
         self.trades_label.setText(f"Сделок: {trades_count}")
         
@@ -56,16 +69,70 @@ class TradeInfoWidget(QFrame):
         self.win_rate_label.setText(f"Винрейт: {win_rate:.1f}%")
         
         self.win_sum_label.setText(f"Сумма выигрышей: {win_sum:.2f}")
-        self.win_sum_label.setStyleSheet("color: #26a69a;")
         
         if last_trade_profit is not None:
             self.last_trade_label.setText(f"Последняя сделка: {last_trade_profit:.2f}")
-            self.last_trade_label.setStyleSheet(
-                f"color: {'#26a69a' if last_trade_profit >= 0 else '#ef5350'};"
-            )
+            self._set_profit_color(self.last_trade_label, last_trade_profit)
         
         self.setVisible(True)
 
+    @staticmethod
+    def _set_profit_color(label: QLabel, value: float) -> None:
+        """Переключает цвет метки через свойство, без разбора новой таблицы стилей."""
+        state = "pos" if value >= 0 else "neg"
+        if label.property("profit") == state:
+            return
+        label.setProperty("profit", state)
+        # Qt не пересчитывает стиль при смене свойства сам
+        style = label.style()
+        style.unpolish(label)
+        style.polish(label)
+
+
+class CandlestickItem(pg.GraphicsObject):
+    """Все свечи одним объектом: отрисовываются в QPicture за один проход QPainter.
+
+    Заменяет пару QGraphicsItem (фитиль + тело) на каждый бар.
+    """
+
+    def __init__(self, bull_pen, bear_pen, bull_brush, bear_brush):
+        super().__init__()
+        self._picture = QPicture()
+        self._bounds = QRectF()
+        # Перья и кисти общие для всех баров одного направления — создаются один раз
+        self._styles = ((bull_pen, bull_brush), (bear_pen, bear_brush))
+
+    def set_data(self, x: np.ndarray, opens: np.ndarray, highs: np.ndarray,
+                 lows: np.ndarray, closes: np.ndarray) -> None:
+        picture = QPicture()
+        painter = QPainter(picture)
+        bullish = closes >= opens
+        for mask, (pen, brush) in zip((bullish, ~bullish), self._styles):
+            if not mask.any():
+                continue
+            painter.setPen(pen)
+            painter.setBrush(brush)
+            xs, o, h, l, c = x[mask], opens[mask], highs[mask], lows[mask], closes[mask]
+            painter.drawLines([QLineF(*line) for line in zip(xs, l, xs, h)])
+            painter.drawRects([QRectF(*rect) for rect in zip(xs - 0.4, o, np.full(len(xs), 0.8), c - o)])
+        painter.end()
+
+        self.prepareGeometryChange()
+        self._picture = picture
+        if len(x):
+            low, high = float(lows.min()), float(highs.max())
+            self._bounds = QRectF(float(x[0]) - 0.5, low, float(x[-1] - x[0]) + 1.0, high - low)
+        else:
+            self._bounds = QRectF()
+        self.informViewBoundsChanged()
+        self.update()
+
+    def paint(self, painter, *args):
+        painter.drawPicture(0, 0, self._picture)
+
+    def boundingRect(self) -> QRectF:
+        return self._bounds
+
 
 class ModernChart(QWidget):
     """Виджет графика на основе pyqtgraph с современным видом."""
@@ -75,9 +142,21 @@ class ModernChart(QWidget):
         self.figi = figi
         self.max_bars = max_bars
         self.sma_period = sma_period
-        self._df = pd.DataFrame(
-            columns=["time", "open", "close", "high", "low", "volume"]
-        ).set_index("time")
+        # --- Кольцевой буфер свечей (по массиву на колонку) ---
+        # _head — сколько свечей записано всего, _n — сколько из них хранится
+        self._t = np.empty(max_bars, dtype=object)
+        self._open = np.empty(max_bars, dtype=np.float64)
+        self._high = np.empty(max_bars, dtype=np.float64)
+        self._low = np.empty(max_bars, dtype=np.float64)
+        self._close = np.empty(max_bars, dtype=np.float64)
+        self._volume = np.empty(max_bars, dtype=np.float64)
+        self._head = 0
+        self._n = 0
+
+        # --- Инкрементальная SMA: скользящая сумма по последним sma_period закрытиям ---
+        self._close_deque: collections.deque[float] = collections.deque(maxlen=sma_period)
+        self._sma_sum = 0.0
+        self._sma_values: list[float] = []
 
         # --- Состояние видимости ---
         self._volume_visible = True
@@ -86,8 +165,11 @@ class ModernChart(QWidget):
         self._signals_visible = True
 
         # --- Данные для отображения сигналов ---
-        self._trade_entries: List[Dict[str, Any]] = []
-        self._trade_exits: List[Dict[str, Any]] = []
+        # Точки маркеров (x, y), вычисленные один раз в момент прихода сигнала
+        self._entry_points: List[Tuple[int, float]] = []
+        self._exit_points: List[Tuple[int, float]] = []
+        # Время свечи -> абсолютный номер первой хранимой свечи с этим временем
+        self._ts_index: Dict[datetime.datetime, int] = {}
         self._total_profit = 0.0
         self._trades_count = 0
         self._winning_trades = 0
@@ -119,8 +201,21 @@ class ModernChart(QWidget):
         self._volume_plot.getAxis("left").setWidth(60)
         self._volume_plot.setXLink(self._price_plot)  # Синхронизация по оси X
 
+        # Автомасштаб средствами ViewBox: границы пересчитываются лениво, раз за кадр,
+        # и автоматически отключаются, когда пользователь двигает или масштабирует график
+        # (вернуть можно кнопкой "A" или сменой потока).
+        self._price_plot.enableAutoRange()
+        self._volume_plot.enableAutoRange()
+
         # Элементы графика
-        self._candle_items_list: list[pg.GraphicsObject] = []
+        self._bull_pen = pg.mkPen("#26a69a")
+        self._bear_pen = pg.mkPen("#ef5350")
+        self._bull_brush = pg.mkBrush("#26a69a")
+        self._bear_brush = pg.mkBrush("#ef5350")
+        self._candle_item = CandlestickItem(
+            self._bull_pen, self._bear_pen, self._bull_brush, self._bear_brush
+        )
+        self._price_plot.addItem(self._candle_item)
         self._volume_item = pg.BarGraphItem(x=[], height=[], width=0.6, brushes=[])
         self._volume_plot.addItem(self._volume_item)
         self._sma_item = pg.PlotDataItem(pen=pg.mkPen("#2962ff", width=2))
@@ -128,122 +223,280 @@ class ModernChart(QWidget):
         
         # Элементы для отображения сигналов
         self._entry_markers = pg.ScatterPlotItem(
-            symbol='t', size=15, pen=pg.mkPen(None), brush=pg.mkBrush("#26a69a")
+            symbol='t', size=15, pen=pg.mkPen(None), brush=self._bull_brush
         )
         self._exit_markers = pg.ScatterPlotItem(
-            symbol='t1', size=15, pen=pg.mkPen(None), brush=pg.mkBrush("#ef5350")
+            symbol='t1', size=15, pen=pg.mkPen(None), brush=self._bear_brush
         )
         self._price_plot.addItem(self._entry_markers)
         self._price_plot.addItem(self._exit_markers)
 
+        # Перерисовка не чаще ~60 раз в секунду, сколько бы свечей ни пришло
+        self._series_dirty = False
+        self._signals_dirty = False
+        # Объёмы меняются только с новой свечой или переключением видимости
+        self._volume_dirty = True
+        self._redraw_timer = QTimer(self)
+        self._redraw_timer.setSingleShot(True)
+        self._redraw_timer.setInterval(16)
+        self._redraw_timer.timeout.connect(self._do_redraw)
+        self._rebuild_redraw()
+
         self.redraw()
 
+    def _ordered(self, arr: np.ndarray) -> np.ndarray:
+        """Возвращает хранимые значения колонки от старой свечи к новой."""
+        if self._n < self.max_bars:
+            return arr[: self._n]
+        pos = self._head % self.max_bars
+        return np.concatenate((arr[pos:], arr[:pos]))
+
+    def _x_coords(self) -> np.ndarray:
+        """X-координаты хранимых свечей: абсолютный номер свечи с начала потока.
+
+        Уже нарисованные бары и маркеры не сдвигаются при добавлении новой свечи.
+        """
+        return np.arange(self._head - self._n, self._head)
+
     def redraw(self):
-        """Полная перерисовка графика на основе DataFrame."""
-        for item in self._candle_items_list:
-            self._price_plot.removeItem(item)
-        self._candle_items_list = []
-        
-        if self._df.empty:
-            return
+        """Полная перерисовка: свечи, оверлеи и маркеры сигналов."""
+        self._series_dirty = True
+        self._signals_dirty = True
+        self._schedule_redraw()
+
+    def _append_latest(self):
+        """Обновление после новой свечи: маркеры сигналов уже на своих местах."""
+        self._series_dirty = True
+        self._schedule_redraw()
+
+    def _refresh_signals(self):
+        self._signals_dirty = True
+        self._schedule_redraw()
+
+    def _schedule_redraw(self):
+        # Все обновления, пришедшие в пределах одного кадра, дают одну перерисовку
+        if not self._redraw_timer.isActive():
+            self._redraw_timer.start()
 
-        df = self._df
-        x_coords = list(range(len(df)))
-
-        # Свечи
-        for i, (t, row) in enumerate(df.iterrows()):
-            is_bullish = row.close >= row.open
-            color_str = "#26a69a" if is_bullish else "#ef5350"
-            brush = pg.mkBrush(color_str)
-            pen = pg.mkPen(color_str)
-
-            # Wick
-            wick = pg.QtWidgets.QGraphicsLineItem(i, row.low, i, row.high)
-            wick.setPen(pen)
-            self._price_plot.addItem(wick)
-            self._candle_items_list.append(wick)
-
-            # Body
-            body = pg.QtWidgets.QGraphicsRectItem(i - 0.4, row.open, 0.8, row.close - row.open)
-            body.setBrush(brush)
-            body.setPen(pen)
-            self._price_plot.addItem(body)
-            self._candle_items_list.append(body)
-
-        # Объёмы
+    def _do_redraw(self):
+        """Выполняет отложенную перерисовку того, что изменилось с прошлого кадра."""
+        if self._series_dirty:
+            self._series_dirty = False
+            self._draw_series()
+        if self._signals_dirty:
+            self._signals_dirty = False
+            self._draw_signals()
+
+    def _rebuild_redraw(self):
+        """Собирает список шагов перерисовки под текущие флаги видимости.
+
+        Флаги меняются редко, а перерисовка идёт на каждой свечи: скрытые оверлеи
+        просто не попадают в список и не проверяются на каждом кадре.
+        """
+        steps = [self._draw_candles]
         if self._volume_visible:
-            colors = ["#26a69a" if r.close >= r.open else "#ef5350" for _, r in df.iterrows()]
-            self._volume_item.setOpts(x=x_coords, height=df.volume, brushes=colors)
-        else:
+            steps.append(self._draw_volume)
+        if self._sma_visible:
+            steps.append(self._draw_sma)
+        self._series_steps = tuple(steps)
+
+    def _draw_series(self):
+        """Свечи и видимые оверлеи по текущему содержимому кольцевого буфера."""
+        if self._n == 0:
+            self._candle_item.set_data(*(np.empty(0),) * 5)
             self._volume_item.setOpts(x=[], height=[])
+            self._volume_dirty = False
+            self._sma_item.clear()
+            return
+
+        x_coords = self._x_coords()
+        opens = self._ordered(self._open)
+        closes = self._ordered(self._close)
+        for step in self._series_steps:
+            step(x_coords, opens, closes)
+
+    def _draw_candles(self, x_coords: np.ndarray, opens: np.ndarray, closes: np.ndarray):
+        self._candle_item.set_data(
+            x_coords, opens, self._ordered(self._high), self._ordered(self._low), closes
+        )
 
-        # SMA
-        if self._sma_visible and len(df) >= self.sma_period:
-            sma = df["close"].rolling(self.sma_period).mean().to_numpy()
-            self._sma_item.setData(x=x_coords, y=sma)
+    def _draw_volume(self, x_coords: np.ndarray, opens: np.ndarray, closes: np.ndarray):
+        if not self._volume_dirty:
+            return
+        self._volume_dirty = False
+        brushes = np.where(closes >= opens, self._bull_brush, self._bear_brush).tolist()
+        self._volume_item.setOpts(x=x_coords, height=self._ordered(self._volume), brushes=brushes)
+
+    def _draw_sma(self, x_coords: np.ndarray, opens: np.ndarray, closes: np.ndarray):
+        if self._n >= self.sma_period:
+            self._sma_item.setData(x=x_coords, y=self._sma_values)
         else:
             self._sma_item.clear()
-        
-        # Сигналы входа и выхода
-        if self._signals_visible:
-            # Отображаем маркеры входа
-            entry_x = []
-            entry_y = []
-            for entry in self._trade_entries:
-                if entry['timestamp'] in df.index:
-                    idx = df.index.get_loc(entry['timestamp'])
-                    if isinstance(idx, slice):
-                        # Если получили slice вместо индекса, берем первый элемент
-                        idx = idx.start
-                    entry_x.append(idx)
-                    entry_y.append(df.iloc[idx].low * 0.999)  # Чуть ниже свечи
-            
-            self._entry_markers.setData(entry_x, entry_y)
-            
-            # Отображаем маркеры выхода
-            exit_x = []
-            exit_y = []
-            for exit in self._trade_exits:
-                if exit['timestamp'] in df.index:
-                    idx = df.index.get_loc(exit['timestamp'])
-                    if isinstance(idx, slice):
-                        # Если получили slice вместо индекса, берем первый элемент
-                        idx = idx.start
-                    exit_x.append(idx)
-                    exit_y.append(df.iloc[idx].high * 1.001)  # Чуть выше свечи
-            
-            self._exit_markers.setData(exit_x, exit_y)
-        else:
+
+    def _draw_signals(self):
+        """Маркеры входа и выхода для свечей, которые ещё хранятся в буфере."""
+        if not self._signals_visible or self._n == 0:
             self._entry_markers.clear()
             self._exit_markers.clear()
-        
-        self._price_plot.autoRange()
-        self._volume_plot.autoRange()
+            return
 
-    def update_data(self, candle: Candle) -> None:
-        new_row = pd.Series(
-            {
-                "open": float(quotation_to_decimal(candle.open)),
-                "close": float(quotation_to_decimal(candle.close)),
-                "high": float(quotation_to_decimal(candle.high)),
-                "low": float(quotation_to_decimal(candle.low)),
-                "volume": candle.volume,
-            },
-            name=candle.time,
+        first = self._head - self._n
+        for markers, points in ((self._entry_markers, self._entry_points),
+                                (self._exit_markers, self._exit_points)):
+            # Одна конвертация в массив и векторный фильтр вместо трёх проходов по списку
+            xy = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+            xy = xy[xy[:, 0] >= first]
+            markers.setData(xy[:, 0], xy[:, 1])
+
+    def _add_marker(self, markers: pg.ScatterPlotItem, points: List[Tuple[int, float]],
+                    point: Tuple[int, float] | None) -> None:
+        """Дорисовывает один маркер сигнала, не перестраивая остальные."""
+        if point is None:
+            return
+        points.append(point)
+        if self._signals_visible:
+            markers.addPoints(x=[point[0]], y=[point[1]])
+
+    def _prune_markers(self) -> None:
+        """Убирает маркеры свечей, вытесненных из буфера (точки идут по времени)."""
+        first = self._head - self._n
+        stale = False
+        for points in (self._entry_points, self._exit_points):
+            drop = 0
+            while drop < len(points) and points[drop][0] < first:
+                drop += 1
+            if drop:
+                del points[:drop]
+                stale = True
+        if stale:
+            self._refresh_signals()
+
+    def _signal_point(self, signal: Dict[str, Any], entry: bool) -> Tuple[int, float] | None:
+        """Позиция маркера для сигнала по времени его свечи (None, если свечи нет)."""
+        x = self._ts_index.get(signal['timestamp'])
+        if x is None:
+            return None
+        pos = x % self.max_bars
+        if entry:
+            return x, self._low[pos] * 0.999  # Чуть ниже свечи
+        return x, self._high[pos] * 1.001  # Чуть выше свечи
+
+    @staticmethod
+    def _parse_candle(candle: Candle) -> Tuple[datetime.datetime, float, float, float, float, int]:
+        """Переводит свечу SDK в кортеж (time, open, high, low, close, volume).
+
+        Не трогает состояние виджета, поэтому может выполняться вне GUI-потока.
+        """
+        return (
+            candle.time,
+            quotation_to_float(candle.open),
+            quotation_to_float(candle.high),
+            quotation_to_float(candle.low),
+            quotation_to_float(candle.close),
+            candle.volume,
         )
-        self._df = pd.concat([self._df, new_row.to_frame().T]).iloc[-self.max_bars :]
+
+    def update_data(self, candle: Candle) -> None:
+        self._apply_candle(*self._parse_candle(candle))
+
+    def update_data_batch(self, candles: Iterable[Candle]) -> None:
+        """Добавляет накопленные свечи (от старых к новым); перерисовка будет одна."""
+        parse, apply = self._parse_candle, self._apply_candle
+        for candle in candles:
+            apply(*parse(candle))
+
+    def _apply_candle(self, t: datetime.datetime, o: float, h: float, l: float,
+                      close: float, v: int) -> None:
+        # Пишем свечу в кольцевой буфер поверх самой старой — без DataFrame и concat
+        pos = self._head % self.max_bars
+        if self._n == self.max_bars:
+            self._evict_ts(pos)
+        self._ts_index.setdefault(t, self._head)
+        self._t[pos] = t
+        self._open[pos] = o
+        self._high[pos] = h
+        self._low[pos] = l
+        self._close[pos] = close
+        self._volume[pos] = v
+        self._volume_dirty = True
+        self._head += 1
+        self._n = min(self._n + 1, self.max_bars)
+        self._push_sma(close)
+        self._prune_markers()
+        self._append_latest()
+
+    def load_history(self, candles: Sequence[Candle]) -> None:
+        """Заменяет содержимое графика пачкой исторических свечей (от старых к новым).
+
+        SMA по всей истории считается одним проходом, а не свеча за свечой.
+        """
+        self._reset_buffer()
+        total = len(candles)
+        if total:
+            closes = np.fromiter(
+                (quotation_to_float(c.close) for c in candles), dtype=np.float64, count=total
+            )
+            sma = bulk_sma(closes, self.sma_period)
+
+            kept = candles[-self.max_bars:]
+            n = len(kept)
+            for i, c in enumerate(kept):
+                self._t[i] = c.time
+                self._open[i] = quotation_to_float(c.open)
+                self._high[i] = quotation_to_float(c.high)
+                self._low[i] = quotation_to_float(c.low)
+                self._volume[i] = c.volume
+                self._ts_index.setdefault(c.time, i)
+            self._close[:n] = closes[-n:]
+            self._head = self._n = n
+
+            self._sma_values = sma[-n:].tolist()
+            self._close_deque.extend(closes[-self.sma_period:].tolist())
+            self._sma_sum = float(sum(self._close_deque))
         self.redraw()
 
+    def _evict_ts(self, pos: int) -> None:
+        """Убирает из _ts_index свечу, которую сейчас перезапишет слот *pos*."""
+        old_ts = self._t[pos]
+        ordinal = self._head - self.max_bars
+        if self._ts_index.get(old_ts) != ordinal:
+            return
+        # Обновления одной свечи идут подряд: индекс переходит на следующую копию
+        next_pos = (pos + 1) % self.max_bars
+        if self.max_bars > 1 and self._t[next_pos] == old_ts:
+            self._ts_index[old_ts] = ordinal + 1
+        else:
+            del self._ts_index[old_ts]
+
+    def _push_sma(self, close: float) -> None:
+        """Сдвигает окно SMA на одну свечу за O(1) вместо пересчёта rolling()."""
+        window = self._close_deque
+        if len(window) == self.sma_period:
+            self._sma_sum -= window[0]
+        window.append(close)
+        self._sma_sum += close
+        self._sma_values.append(
+            self._sma_sum / self.sma_period if len(window) == self.sma_period else math.nan
+        )
+        if len(self._sma_values) > self.max_bars:
+            del self._sma_values[: -self.max_bars]
+
+    def _reset_sma(self) -> None:
+        self._close_deque.clear()
+        self._sma_sum = 0.0
+        self._sma_values = []
+
     def process_strategy_signal(self, signal: Dict[str, Any]) -> None:
         """Обрабатывает сигналы от стратегии."""
         signal_type = signal.get('type')
         
         if signal_type == 'trade_entry':
-            self._trade_entries.append(signal)
-            self.redraw()
+            self._add_marker(self._entry_markers, self._entry_points,
+                             self._signal_point(signal, entry=True))
         
         elif signal_type == 'trade_exit':
-            self._trade_exits.append(signal)
+            self._add_marker(self._exit_markers, self._exit_points,
+                             self._signal_point(signal, entry=False))
             self._total_profit = signal.get('total_profit', 0.0)
             self._trades_count += 1
             self._last_trade_profit = signal.get('profit', 0.0)
@@ -259,19 +512,19 @@ class ModernChart(QWidget):
                 self._last_trade_profit,
                 self._win_sum
             )
-            self.redraw()
         
         elif signal_type == 'strategy_started':
             # Сбрасываем статистику при запуске стратегии
-            self._trade_entries = []
-            self._trade_exits = []
+            self._entry_points = []
+            self._exit_points = []
             self._total_profit = 0.0
             self._trades_count = 0
             self._winning_trades = 0
             self._win_sum = 0.0
             self._last_trade_profit = None
             self.trade_info.setVisible(False)
-            self.redraw()
+            self._entry_markers.setData([], [])
+            self._exit_markers.setData([], [])
         
         elif signal_type == 'strategy_stopped':
             # Обновляем итоговую статистику
@@ -290,10 +543,17 @@ class ModernChart(QWidget):
 
     def set_volume_visibility(self, visible: bool):
         self._volume_visible = visible
+        self._volume_dirty = True
+        if not visible:
+            self._volume_item.setOpts(x=[], height=[])
+        self._rebuild_redraw()
         self.redraw()
 
     def set_sma_visibility(self, visible: bool):
         self._sma_visible = visible
+        if not visible:
+            self._sma_item.clear()
+        self._rebuild_redraw()
         self.redraw()
 
     def set_grid_visibility(self, visible: bool):
@@ -305,6 +565,18 @@ class ModernChart(QWidget):
         self.redraw()
 
     def clear_data(self):
-        """Clears the DataFrame and redraws the empty chart."""
-        self._df = self._df.iloc[0:0]
-        self.redraw() 
\ No newline at end of file
+        """Clears the candle buffer and redraws the empty chart."""
+        self._reset_buffer()
+        self.redraw()
+
+    def _reset_buffer(self):
+        self._t[:] = None
+        self._ts_index.clear()
+        self._entry_points = []
+        self._exit_points = []
+        self._head = 0
+        self._n = 0
+        self._volume_dirty = True
+        self._reset_sma()
+        self._price_plot.enableAutoRange()
+        self._volume_plot.enableAutoRange()
@@ -1,3 +1,5 @@
+from types import MappingProxyType
+
 from PyQt6.QtWidgets import (
     QCheckBox, QHBoxLayout, QWidget, QComboBox, QLabel, 
     QPushButton, QFrame, QVBoxLayout
@@ -8,10 +10,20 @@ from tinkoff.invest import CandleInterval
 from bot.gui.chart import ModernChart
 
 
+# Read-only: shared by every ControlPanel instead of being rebuilt per widget
+TIMEFRAMES = MappingProxyType({
+    "1 минута": CandleInterval.CANDLE_INTERVAL_1_MIN,
+    "5 минут": CandleInterval.CANDLE_INTERVAL_5_MIN,
+    "15 минут": CandleInterval.CANDLE_INTERVAL_15_MIN,
+    "1 час": CandleInterval.CANDLE_INTERVAL_HOUR,
+    "1 день": CandleInterval.CANDLE_INTERVAL_DAY,
+})
+
+
 class ControlPanel(QWidget):
     """Панель управления графиком (чекбоксы, индикаторы, таймфрейм) и стратегией."""
 
-    timeframe_changed = pyqtSignal(CandleInterval)
+    timeframe_changed = pyqtSignal(object)  # CandleInterval
     strategy_start = pyqtSignal()
     strategy_stop = pyqtSignal()
 
@@ -54,13 +66,7 @@ class ControlPanel(QWidget):
         # --- Выбор таймфрейма ---
         chart_controls.addWidget(QLabel("Таймфрейм:"))
         self.timeframe_combo = QComboBox(self)
-        self.timeframes = {
-            "1 минута": CandleInterval.CANDLE_INTERVAL_1_MIN,
-            "5 минут": CandleInterval.CANDLE_INTERVAL_5_MIN,
-            "15 минут": CandleInterval.CANDLE_INTERVAL_15_MIN,
-            "1 час": CandleInterval.CANDLE_INTERVAL_HOUR,
-            "1 день": CandleInterval.CANDLE_INTERVAL_DAY,
-        }
+        self.timeframes = TIMEFRAMES
         self.timeframe_combo.addItems(self.timeframes.keys())
         self.timeframe_combo.currentTextChanged.connect(self._on_timeframe_change)
         chart_controls.addWidget(self.timeframe_combo)
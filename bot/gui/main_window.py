@@ -1,14 +1,18 @@
 from __future__ import annotations
 
 import asyncio
+import collections
+import contextlib
+import functools
 import importlib
 from PyQt6.QtWidgets import QApplication, QMainWindow, QVBoxLayout, QWidget, QTabWidget, QMessageBox
-from qasync import QEventLoop
-from PyQt6.QtCore import QTimer
+from qasync import QEventLoop, asyncSlot
+from PyQt6.QtCore import QTimer, pyqtSignal
 import logging
 from tinkoff.invest import CandleInterval
 
 from bot.core.client import InvestClient
+from bot.core.pipeline import AsyncBatcher, put_drop_oldest
 from bot.gui.chart import ModernChart
 from bot.gui.controls import ControlPanel
 from bot.gui.settings import SettingsPanel
@@ -16,10 +20,56 @@ from bot.strategies.base import Strategy
 
 logger = logging.getLogger(__name__)
 
+# Имя класса стратегии -> модуль, в котором он определён
+_STRATEGY_REGISTRY = {
+    "SmaCrossStrategy": "bot.strategies.sma_cross",
+    "EchoStrategy": "bot.strategies.echo",
+}
+
+# Имя класса стратегии -> собственные аргументы конструктора из сохранённых параметров
+# (client, figi и on_signal_callback общие для всех стратегий)
+_STRATEGY_KWARGS = {
+    "SmaCrossStrategy": lambda params: {
+        "fast": params.get("fast", 20),
+        "slow": params.get("slow", 50),
+        "qty": params.get("qty", 1),
+    },
+    "EchoStrategy": lambda params: {},
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _resolve_strategy_cls(name: str) -> type[Strategy]:
+    """Импортирует модуль стратегии и возвращает её класс (один раз на имя)."""
+    try:
+        module_path = _STRATEGY_REGISTRY[name]
+    except KeyError:
+        # Можно добавить другие стратегии по мере необходимости
+        raise ValueError(f"Неизвестный класс стратегии: {name}") from None
+    return getattr(importlib.import_module(module_path), name)
+
+
+class _SharedClient:
+    """Клиент для стратегии: ордера уходят через общее соединение окна."""
+
+    __slots__ = ("_connect",)
+
+    def __init__(self, connect) -> None:
+        self._connect = connect
+
+    async def place_market_order(self, figi: str, qty: int, direction: str) -> None:
+        logger.info("Strategy requested market order: %s %d lots of %s",
+                    direction.upper(), qty, figi)
+        client = await self._connect()
+        await client.place_market_order(figi, qty, direction)
+
 
 class ModernWindow(QMainWindow):
     """Основное окно приложения с графиком и настройками."""
 
+    # Сигналы стратегии приходят в окно через Qt-сигнал
+    strategy_signal = pyqtSignal(object)
+
     def __init__(self, figi: str):
         super().__init__()
         logger.debug("Initializing ModernWindow for FIGI: %s", figi)
@@ -27,8 +77,13 @@ class ModernWindow(QMainWindow):
         self.resize(1000, 700)
         self.figi = figi
         
-        # Для работы со стратегией
+        # Для работы со стратегией: стрим кладёт свечи в очередь, а стратегия
+        # разбирает её в своей задаче и не задерживает чтение стрима
         self._strategy_task: asyncio.Task | None = None
+        self._strategy_queue: asyncio.Queue | None = None
+        # Пока идёт запуск или остановка, повторные нажатия кнопок игнорируются
+        self._strategy_busy = False
+        self.strategy_signal.connect(self._on_strategy_signal)
         self._strategy_instance: Strategy | None = None
         self._strategy_class_name = "SmaCrossStrategy"
         self._strategy_params = {}
@@ -68,53 +123,97 @@ class ModernWindow(QMainWindow):
         main_layout.addWidget(self.tab_widget)
 
         self._current_stream_task: asyncio.Task | None = None
-        # Start initial stream once the event loop is running
-        QTimer.singleShot(0, lambda: self.change_stream(CandleInterval.CANDLE_INTERVAL_1_MIN))
+        # Таймфрейм текущего стрима: переподключение не опрашивает комбобокс
+        self._current_interval: CandleInterval = CandleInterval.CANDLE_INTERVAL_1_MIN
+        # Отменённые стримы, которые ещё завершаются в фоне
+        self._closing_streams: set[asyncio.Task] = set()
+
+        # Одно соединение с API на всё окно: стримы и ордера используют его,
+        # а не открывают новый gRPC-канал при каждой смене таймфрейма
+        self._ic: InvestClient | None = None
+        self._ic_lock = asyncio.Lock()
+        # Ордера стратегий идут через то же соединение, что и стрим свечей
+        self._strategy_client = _SharedClient(self._ensure_client)
+
+        # Свечи из стрима копятся здесь и уходят на график пачкой раз в 50 мс
+        self._pending_candles: collections.deque = collections.deque()
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(50)
+        self._flush_timer.timeout.connect(self._flush_candles)
+
+        # Start initial stream once the event loop is running (qasync: it is the Qt loop)
+        asyncio.get_event_loop().call_soon(self.change_stream, self._current_interval)
         logger.debug("ModernWindow initialization complete.")
 
     def change_stream(self, interval: CandleInterval):
-        """Cancels the old stream task and starts a new one for the given interval."""
+        """Cancels the old stream task and starts a new one for the given interval.
 
-        async def _async_change_stream():
-            # Cancel and wait for the old task to finish
-            if self._current_stream_task:
-                logger.debug("Cancelling previous stream task...")
-                self._current_stream_task.cancel()
-                try:
-                    await self._current_stream_task
-                except asyncio.CancelledError:
-                    logger.debug("Stream task for %s was cancelled.", interval.name)
-                self._current_stream_task = None
+        The old stream is not awaited: it shuts down in the background while the
+        new one is already subscribing.
+        """
+        self._cancel_stream()
+        self._current_interval = interval
+
+        # Start the new task
+        self._pending_candles.clear()
+        self.chart.clear_data()
+        logger.info("Starting new candle stream for interval: %s", interval.name)
+        self._current_stream_task = asyncio.create_task(self._stream_candles(interval))
+
+    def _cancel_stream(self) -> None:
+        """Cancels the current stream task and keeps it referenced until it finishes."""
+        task, self._current_stream_task = self._current_stream_task, None
+        if task is None:
+            return
+        logger.debug("Cancelling previous stream task...")
+        task.cancel()
+        self._closing_streams.add(task)
+        task.add_done_callback(self._closing_streams.discard)
+
+    async def _ensure_client(self) -> InvestClient:
+        """Возвращает общее соединение с API, открывая его при первом обращении."""
+        async with self._ic_lock:
+            if self._ic is None:
+                ic = InvestClient()
+                await ic.__aenter__()
+                self._ic = ic
+            return self._ic
 
-            # Start the new task
-            self.chart.clear_data()
-            logger.info("Starting new candle stream for interval: %s", interval.name)
-            self._current_stream_task = asyncio.create_task(self._stream_candles(interval))
+    async def _close_client(self) -> None:
+        async with self._ic_lock:
+            ic, self._ic = self._ic, None
+            if ic is not None:
+                await ic.__aexit__(None, None, None)
 
-        asyncio.create_task(_async_change_stream())
+    def _flush_candles(self) -> None:
+        """Передаёт накопленные свечи на график одним вызовом."""
+        if not self._pending_candles:
+            return
+        candles = list(self._pending_candles)
+        self._pending_candles.clear()
+        self.chart.update_data_batch(candles)
 
     async def _stream_candles(self, interval: CandleInterval) -> None:
         """Subscribes to candles and updates the chart."""
         logger.debug("Stream task started for interval: %s", interval.name)
         stream_mgr = None
         try:
-            async with InvestClient() as ic:
-                logger.debug("InvestClient entered for interval: %s", interval.name)
-                stream_mgr, candle_iter = await ic.stream_candles(
-                    figi=self.chart.figi, interval=interval
-                )
-                async for candle in candle_iter:
-                    self.chart.update_data(candle)
-                    
-                    # Если стратегия запущена, отправляем ей свечи
-                    if self._strategy_instance:
-                        try:
-                            await self._strategy_instance.on_candle(candle)
-                        except Exception as e:
-                            logger.error("Error in strategy.on_candle: %s", e)
-                            self._show_strategy_error(f"Ошибка обработки свечи: {e}")
-                            await self.stop_strategy()
-                    
+            ic = await self._ensure_client()
+            logger.debug("Using shared InvestClient for interval: %s", interval.name)
+            stream_mgr, candle_iter = await ic.stream_candles(
+                figi=self.chart.figi, interval=interval
+            )
+            async for candle in candle_iter:
+                self._pending_candles.append(candle)
+                if not self._flush_timer.isActive():
+                    self._flush_timer.start()
+
+                # Если стратегия запущена, отправляем ей свечи (при переполнении
+                # очереди теряется самая старая, а не задерживается стрим)
+                if self._strategy_queue is not None:
+                    put_drop_oldest(self._strategy_queue, candle)
+
         except asyncio.CancelledError:
             # This is expected on timeframe change or close
             logger.debug("Stream task for %s was cancelled.", interval.name)
@@ -123,15 +222,24 @@ class ModernWindow(QMainWindow):
         finally:
             if stream_mgr:
                 logger.debug("Stopping stream manager...")
-                stream_mgr.stop()
+                # stop() синхронный и выполняется сразу, даже при отмене задачи;
+                # его ошибка не должна подменить CancelledError или прервать очистку
+                try:
+                    stream_mgr.stop()
+                except Exception:
+                    logger.exception("Failed to stop the market data stream")
             logger.debug("Stream task for %s finished.", interval.name)
 
-    def _on_token_change(self, new_token: str):
+    @asyncSlot(str)
+    async def _on_token_change(self, new_token: str):
         """Обрабатывает изменение токена API."""
         logger.info("API token has been updated. Reconnecting...")
-        # Перезапускаем текущий стрим, чтобы использовать новый токен
-        current_interval = self.controls.timeframes[self.controls.timeframe_combo.currentText()]
-        self.change_stream(current_interval)
+        # Переоткрываем соединение с новым токеном и перезапускаем текущий стрим
+        # Старое соединение можно закрыть только после того, как все стримы на нём остановятся
+        self._cancel_stream()
+        await asyncio.gather(*self._closing_streams, return_exceptions=True)
+        await self._close_client()
+        self.change_stream(self._current_interval)
     
     def _on_strategy_params_change(self, params: dict):
         """Обрабатывает изменение параметров стратегии."""
@@ -150,51 +258,16 @@ class ModernWindow(QMainWindow):
     def _create_strategy_instance(self) -> Strategy:
         """Создаёт экземпляр выбранной стратегии с указанными параметрами."""
         try:
-            # Преобразуем CamelCase имя класса в snake_case для модуля
-            # Например, SmaCrossStrategy -> sma_cross
-            module_name = self._strategy_class_name
-            if module_name == "SmaCrossStrategy":
-                module_path = "bot.strategies.sma_cross"
-            elif module_name == "EchoStrategy":
-                module_path = "bot.strategies.echo"
-            else:
-                # Можно добавить другие стратегии по мере необходимости
-                raise ValueError(f"Неизвестный класс стратегии: {module_name}")
-            
-            # Импортируем модуль стратегии
-            module = importlib.import_module(module_path)
-            
-            # Получаем класс стратегии
-            strategy_class = getattr(module, self._strategy_class_name)
-            
-            # Используем "заглушку" для клиента вместо создания нового InvestClient
-            # Реальные запросы будут отправляться через InvestClient, который создается в _stream_candles
-            class ClientStub:
-                """Заглушка для клиента API, чтобы избежать создания нового соединения."""
-                async def place_market_order(self, figi: str, qty: int, direction: str) -> None:
-                    """Делегирует запрос на выполнение ордера в основной UI поток."""
-                    logger.info("Strategy requested market order: %s %d lots of %s", 
-                                direction.upper(), qty, figi)
-                    # TODO: В будущем здесь будет код для выполнения ордера
-                    # через централизованный InvestClient в GUI
+            name = self._strategy_class_name
+            strategy_class = _resolve_strategy_cls(name)
             
             # Создаем стратегию с параметрами
-            if self._strategy_class_name == "SmaCrossStrategy":
-                params = self._strategy_params.get("sma_cross", {})
-                return strategy_class(
-                    client=ClientStub(),
-                    figi=self.figi,
-                    fast=params.get("fast", 20),
-                    slow=params.get("slow", 50),
-                    qty=params.get("qty", 1),
-                    on_signal_callback=self._on_strategy_signal
-                )
-            else:
-                return strategy_class(
-                    client=ClientStub(), 
-                    figi=self.figi,
-                    on_signal_callback=self._on_strategy_signal
-                )
+            return strategy_class(
+                client=self._strategy_client,
+                figi=self.figi,
+                on_signal_callback=self.strategy_signal.emit,
+                **_STRATEGY_KWARGS[name](self._strategy_params),
+            )
                 
         except Exception as e:
             logger.exception("Error creating strategy instance")
@@ -213,6 +286,11 @@ class ModernWindow(QMainWindow):
             
             # Вызываем хук on_start
             await self._strategy_instance.on_start()
+
+            self._strategy_queue = asyncio.Queue(maxsize=64)
+            self._strategy_task = asyncio.create_task(
+                self._strategy_loop(self._strategy_instance, self._strategy_queue)
+            )
             
             # Отмечаем в UI
             logger.info("Strategy started successfully")
@@ -222,10 +300,29 @@ class ModernWindow(QMainWindow):
             self._show_strategy_error(f"Ошибка запуска стратегии: {e}")
             await self.stop_strategy()
     
+    async def _strategy_loop(self, strategy: Strategy, queue: asyncio.Queue) -> None:
+        """Передаёт свечи из очереди в стратегию пачками, пока её не остановят."""
+        async for candles in AsyncBatcher(queue, max_items=32):
+            try:
+                await strategy.on_candles(candles)
+            except Exception as e:
+                logger.error("Error in strategy.on_candle: %s", e)
+                self._show_strategy_error(f"Ошибка обработки свечи: {e}")
+                await self.stop_strategy()
+                return
+
     async def stop_strategy(self):
         """Останавливает текущую стратегию."""
         if not self._strategy_instance:
             return
+
+        # Сначала перестаём подавать свечи, затем останавливаем обработчик очереди
+        self._strategy_queue = None
+        task, self._strategy_task = self._strategy_task, None
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
             
         try:
             # Вызываем хук on_stop
@@ -249,26 +346,47 @@ class ModernWindow(QMainWindow):
     def closeEvent(self, event):
         """Ensure task is cancelled on window close."""
         logger.debug("Close event received, cancelling stream task.")
-        if self._current_stream_task:
-            self._current_stream_task.cancel()
+        self._cancel_stream()
             
-        # Останавливаем стратегию при закрытии
-        if self._strategy_instance:
-            asyncio.create_task(self.stop_strategy())
+        # Останавливаем стратегию и закрываем соединение с API
+        asyncio.create_task(self._shutdown())
         
         event.accept()
 
-    def _on_strategy_start(self):
+    async def _shutdown(self) -> None:
+        await self.stop_strategy()
+        await asyncio.gather(*self._closing_streams, return_exceptions=True)
+        await self._close_client()
+
+    @asyncSlot()
+    async def _on_strategy_start(self):
         """Обертка для кнопки запуска стратегии."""
-        asyncio.create_task(self.start_strategy())
+        if self._strategy_busy:
+            return
+        self._strategy_busy = True
+        try:
+            await self.start_strategy()
+        finally:
+            self._strategy_busy = False
     
-    def _on_strategy_stop(self):
+    @asyncSlot()
+    async def _on_strategy_stop(self):
         """Обертка для кнопки остановки стратегии."""
-        asyncio.create_task(self.stop_strategy())
+        if self._strategy_busy:
+            return
+        self._strategy_busy = True
+        try:
+            await self.stop_strategy()
+        finally:
+            self._strategy_busy = False
 
     def _on_strategy_signal(self, signal: dict):
         """Обрабатывает сигналы от стратегии."""
-        logger.debug("Received strategy signal: %s", signal.get('type', 'unknown'))
+        # Вызывается на каждый сигнал (у EchoStrategy — на каждую свечу)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Received strategy signal: %s", signal.get('type', 'unknown'))
+        # Свеча сигнала может ещё ждать в буфере: маркер ставится по её времени
+        self._flush_candles()
         # Передаем сигнал в график для отображения
         self.chart.process_strategy_signal(signal)
 
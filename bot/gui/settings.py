@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-import json
+import copy
+import functools
 import os
 from pathlib import Path
 from PyQt6.QtWidgets import (
@@ -10,7 +11,21 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import pyqtSignal
 
-from bot.config import Settings
+from bot.config import PROJECT_ROOT, Settings, get_settings, json_dumps, json_loads
+
+# Имя стратегии в списке -> ключ её параметров в settings.json
+_STRATEGY_KEY_MAP = {"SmaCrossStrategy": "sma_cross", "EchoStrategy": "echo"}
+
+_DEFAULT_SETTINGS = {
+    "sma_cross": {"fast": 20, "slow": 50, "qty": 1}
+}
+
+
+@functools.lru_cache(maxsize=8)
+def _load_settings_cached(path: str, mtime_ns: int) -> dict:
+    """Разобранный settings.json; mtime в ключе отбрасывает устаревшую запись."""
+    with open(path, "rb") as f:
+        return json_loads(f.read())
 
 
 class SettingsPanel(QWidget):
@@ -24,7 +39,7 @@ class SettingsPanel(QWidget):
         super().__init__()
         
         # Загрузка текущих настроек
-        self.settings_file = Path(__file__).resolve().parent.parent.parent / "settings.json"
+        self.settings_file = PROJECT_ROOT / "settings.json"
         self.settings = self._load_settings()
         
         # Создаем основной лейаут и вкладки
@@ -89,20 +104,21 @@ class SettingsPanel(QWidget):
         # Настройки SMA-Cross стратегии
         self.sma_settings = QGroupBox("Параметры SMA-Cross")
         sma_layout = QFormLayout(self.sma_settings)
+        sma_params = self.settings.get("sma_cross") or {}
         
         self.fast_sma_spin = QSpinBox()
         self.fast_sma_spin.setRange(1, 200)
-        self.fast_sma_spin.setValue(self.settings.get("sma_cross", {}).get("fast", 20))
+        self.fast_sma_spin.setValue(sma_params.get("fast", 20))
         sma_layout.addRow("Быстрая SMA (период):", self.fast_sma_spin)
         
         self.slow_sma_spin = QSpinBox()
         self.slow_sma_spin.setRange(2, 500)
-        self.slow_sma_spin.setValue(self.settings.get("sma_cross", {}).get("slow", 50))
+        self.slow_sma_spin.setValue(sma_params.get("slow", 50))
         sma_layout.addRow("Медленная SMA (период):", self.slow_sma_spin)
         
         self.sma_qty_spin = QSpinBox()
         self.sma_qty_spin.setRange(1, 100)
-        self.sma_qty_spin.setValue(self.settings.get("sma_cross", {}).get("qty", 1))
+        self.sma_qty_spin.setValue(sma_params.get("qty", 1))
         sma_layout.addRow("Количество лотов:", self.sma_qty_spin)
         
         strategy_layout.addWidget(self.sma_settings)
@@ -125,17 +141,20 @@ class SettingsPanel(QWidget):
     
     def _get_current_sandbox_token(self):
         """Получает текущий токен песочницы."""
+        # Токен из settings.json уже в памяти: conf трогаем только если его там нет
+        token = self.settings.get("sandbox_token")
+        if token:
+            return token
         try:
-            return self.settings.get("sandbox_token", "") or Settings()._conf_path.read_text(encoding="utf-8").splitlines()[0].split()[0]
-        except:
+            # Общий экземпляр Settings: conf уже разобран, файл заново не читается
+            return get_settings().sandbox_token or ""
+        except (OSError, ValueError):
+            # Нечитаемый conf (нет прав, каталог вместо файла) — просто пустое поле
             return ""
     
     def _get_current_prod_token(self):
         """Получает текущий боевой токен."""
-        try:
-            return self.settings.get("production_token", "")
-        except:
-            return ""
+        return self.settings.get("production_token", "")
     
     def _browse_conf_file(self):
         """Открывает диалог выбора файла для conf."""
@@ -160,6 +179,9 @@ class SettingsPanel(QWidget):
                     f.write(f"{self.sandbox_token_edit.text()} песочница\n")
                 if self.production_token_edit.text():
                     f.write(f"{self.production_token_edit.text()} прод\n")
+            Settings.invalidate(conf_path)
+            # Следующий InvestClient должен подхватить новый токен
+            get_settings.cache_clear()
             
             QMessageBox.information(self, "Успех", "Токены успешно сохранены")
             self.token_changed.emit(self.sandbox_token_edit.text())
@@ -194,29 +216,30 @@ class SettingsPanel(QWidget):
         self._save_settings()
         self.strategy_params_changed.emit({
             "strategy": strategy,
-            "params": self.settings.get(strategy.lower(), {})
+            "params": self.settings.get(_STRATEGY_KEY_MAP[strategy], {})
         })
         QMessageBox.information(self, "Успех", "Настройки стратегии успешно сохранены")
     
     def _load_settings(self):
-        """Загружает настройки из файла."""
-        if not self.settings_file.exists():
-            return {
-                "sma_cross": {"fast": 20, "slow": 50, "qty": 1}
-            }
+        """Загружает настройки из файла (повторно разбирается только изменённый файл)."""
+        try:
+            mtime_ns = self.settings_file.stat().st_mtime_ns
+        except OSError:
+            return copy.deepcopy(_DEFAULT_SETTINGS)
         
         try:
-            with open(self.settings_file, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except:
-            return {
-                "sma_cross": {"fast": 20, "slow": 50, "qty": 1}
-            }
+            # Панель меняет словарь настроек, поэтому закэшированный оригинал не отдаём
+            return copy.deepcopy(_load_settings_cached(str(self.settings_file), mtime_ns))
+        except (OSError, ValueError):
+            # ValueError покрывает JSONDecodeError и json, и orjson
+            return copy.deepcopy(_DEFAULT_SETTINGS)
     
     def _save_settings(self):
         """Сохраняет настройки в файл."""
         try:
-            with open(self.settings_file, "w", encoding="utf-8") as f:
-                json.dump(self.settings, f, indent=2)
+            # Один буфер и одна запись вместо множества мелких write() из json.dump
+            self.settings_file.write_bytes(json_dumps(self.settings))
+            Settings.invalidate(self.settings_file)
+            _load_settings_cached.cache_clear()
         except Exception as e:
             QMessageBox.critical(self, "Ошибка", f"Не удалось сохранить настройки: {e}") 
\ No newline at end of file
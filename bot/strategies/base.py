@@ -1,11 +1,18 @@
 from __future__ import annotations
 
 import abc
-from typing import Any
+import contextlib
+from typing import Any, Callable, Dict, Iterator, Sequence
 
 
 class Strategy(abc.ABC):
-    """Abstract base class for all user strategies."""
+    """Abstract base class for all user strategies.
+
+    Subclasses that declare ``__slots__`` get instances without a ``__dict__``;
+    those that don't keep working as usual.
+    """
+
+    __slots__ = ("client", "figi")
 
     name: str = "AbstractStrategy"
 
@@ -27,4 +34,73 @@ class Strategy(abc.ABC):
     @abc.abstractmethod
     async def on_candle(self, candle) -> None:  # noqa: D401
         """Handle new candle event."""
-        raise NotImplementedError 
\ No newline at end of file
+        raise NotImplementedError
+
+    async def on_candles(self, candles: Sequence[Any]) -> None:  # noqa: D401
+        """Handle a batch of candles, oldest first.
+
+        The default feeds them to :meth:`on_candle` one by one; override it when
+        the strategy can process a batch at once.
+        """
+        for candle in candles:
+            await self.on_candle(candle) 
+
+
+class SignalBatcher:
+    """Mixin that coalesces ``on_signal_callback`` calls made while handling candles.
+
+    Inside :meth:`batch` signals sent through :meth:`_emit` are buffered and
+    delivered when the outermost batch exits; for types in ``_COALESCED_TYPES``
+    only the last signal of the batch is delivered. A burst of candles passed to
+    :meth:`on_candles` is one batch, so the UI gets one indicators update for it.
+
+    A slotted subclass must list ``_signal_buffer`` in its ``__slots__`` and set
+    it to ``None`` in ``__init__``: the mixin itself cannot own the slot, since
+    two bases with non-empty slots cannot be combined.
+    """
+
+    __slots__ = ()
+
+    # Signal types where only the latest value in a batch matters
+    _COALESCED_TYPES = frozenset({"indicators_update"})
+
+    on_signal_callback: Callable[[Dict[str, Any]], None] | None
+    _signal_buffer: list | None = None
+
+    def _emit(self, signal: Dict[str, Any]) -> None:
+        if self.on_signal_callback is None:
+            return
+        if self._signal_buffer is None:
+            self.on_signal_callback(signal)
+        else:
+            self._signal_buffer.append(signal)
+
+    @contextlib.contextmanager
+    def batch(self) -> Iterator[None]:
+        """Buffer emitted signals until the outermost ``batch()`` block exits."""
+        if self._signal_buffer is not None:
+            yield
+            return
+        self._signal_buffer = []
+        try:
+            yield
+        finally:
+            buffered, self._signal_buffer = self._signal_buffer, None
+            self._flush_signals(buffered)
+
+    def _flush_signals(self, signals: list) -> None:
+        callback = self.on_signal_callback
+        if callback is None or not signals:
+            return
+        last = {s["type"]: i for i, s in enumerate(signals) if s.get("type") in self._COALESCED_TYPES}
+        for i, signal in enumerate(signals):
+            kind = signal.get("type")
+            if kind in last and last[kind] != i:
+                continue
+            callback(signal)
+
+    async def on_candles(self, candles: Sequence[Any]) -> None:  # noqa: D401
+        """Handle a batch of candles as one signal batch."""
+        with self.batch():
+            for candle in candles:
+                await self.on_candle(candle)
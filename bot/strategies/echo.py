@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import logging
 from typing import Callable, Dict, Any
-from tinkoff.invest.utils import quotation_to_decimal
+from bot.core.quotation import quotation_to_float
 from bot.strategies.base import Strategy
 
 
@@ -12,6 +12,8 @@ logger = logging.getLogger(__name__)
 class EchoStrategy(Strategy):
     """Простейшая стратегия, которая лишь выводит полученные свечи."""
 
+    __slots__ = ("candle_count", "on_signal_callback")
+
     name = "EchoStrategy"
 
     def __init__(self, client, figi: str, on_signal_callback: Callable[[Dict[str, Any]], None] = None):
@@ -48,26 +50,34 @@ class EchoStrategy(Strategy):
         # Увеличиваем счетчик свечей
         self.candle_count += 1
         
+        # Время и цена нужны только для лога и сигнала: без них свеча лишь считается
+        log_info = logger.isEnabledFor(logging.INFO)
+        cb = self.on_signal_callback
+        if not log_info and cb is None:
+            return
+        
         # `time` already a timezone-aware datetime in SDK 0.2.0+
         ts = candle.time.astimezone()
-        close_price = quotation_to_decimal(candle.close)
+        close_price = quotation_to_float(candle.close)
         
         # Логируем информацию о свече
-        logger.info(
-            "[%s] FIGI=%s close=%s vol=%d (processed %d candles)",
-            ts.strftime("%Y-%m-%d %H:%M:%S"),
-            self.figi,
-            close_price,
-            candle.volume,
-            self.candle_count
-        )
+        if log_info:
+            logger.info(
+                "[%s] FIGI=%s close=%s vol=%d (processed %d candles)",
+                # isoformat без strftime и локали; срез убирает смещение зоны (YYYY-MM-DD HH:MM:SS)
+                ts.isoformat(sep=" ", timespec="seconds")[:19],
+                self.figi,
+                close_price,
+                candle.volume,
+                self.candle_count
+            )
         
         # Отправляем сигнал о новой свече
-        if self.on_signal_callback:
-            self.on_signal_callback({
+        if cb is not None:
+            cb({
                 "type": "candle_received",
                 "timestamp": ts,
-                "price": float(close_price),
+                "price": close_price,
                 "volume": candle.volume,
                 "candle_count": self.candle_count
             }) 
\ No newline at end of file
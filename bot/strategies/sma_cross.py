@@ -1,21 +1,47 @@
 from __future__ import annotations
 
-import pandas as pd
 import datetime
-from decimal import Decimal
-from typing import Callable, Dict, Any
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Sequence
 
-from bot.strategies.base import Strategy
-from tinkoff.invest.utils import quotation_to_decimal
+import numpy as np
 
+from bot.config import json_dumps, json_loads
+from bot.core.quotation import quotation_to_float, quotation_to_nano
+from bot.core.sma import crossovers
+from bot.strategies.base import SignalBatcher, Strategy
 
-class SmaCrossStrategy(Strategy):
+logger = logging.getLogger(__name__)
+
+# Цены в окне хранятся в нано-единицах (units * 1e9 + nano): целые суммы окон
+# точны, поэтому on_candle, on_history и оба ядра видят одни и те же пересечения
+_NANO = 1_000_000_000
+
+# Позиция, которая сохраняется в файл состояния вместе с окном закрытий; счётчики
+# прибыли и сделок не сохраняются — статистика в UI считается с момента запуска
+_STATE_FIELDS = ("position_open", "entry_price")
+
+
+class SmaCrossStrategy(SignalBatcher, Strategy):
     """Simple SMA( fast, slow) crossover strategy."""
 
+    # Атрибуты в слотах: on_candle читает их на каждой свече без поиска в __dict__
+    __slots__ = (
+        "fast", "slow", "qty", "on_signal_callback", "_signal_buffer", "_emit_every",
+        "_state_file", "_state_interval", "_state_max_age", "_save_every", "_unsaved",
+        "_closes", "_idx", "_filled", "_slow_sum", "_fast_sum", "_prev_sign", "_ready_count",
+        "position_open", "entry_price", "total_profit", "trades_count", "winning_trades", "win_sum",
+    )
+
     name = "SMA-Cross"
 
     def __init__(self, client, figi: str, fast: int = 20, slow: int = 50, qty: int = 1,
-                 on_signal_callback: Callable[[Dict[str, Any]], None] = None):
+                 on_signal_callback: Callable[[Dict[str, Any]], None] = None,
+                 emit_every: int = 1, state_dir: Path | str | None = None, save_every: int = 100,
+                 interval: str | None = None, state_max_age: float = 3600.0):
         super().__init__(client, figi)
         if fast >= slow:
             raise ValueError("fast MA period must be < slow MA period")
@@ -23,9 +49,24 @@ class SmaCrossStrategy(Strategy):
         self.slow = slow
         self.qty = qty  # количество лотов для покупки/продажи
         self.on_signal_callback = on_signal_callback  # колбэк для передачи сигналов в UI
+        self._signal_buffer = None  # слот перекрывает значение по умолчанию из SignalBatcher
+        # indicators_update отправляется раз в emit_every свечей (сделки — всегда)
+        self._emit_every = max(1, emit_every)
+        # Файл состояния (окно закрытий + позиция) позволяет после перезапуска
+        # не ждать slow свечей; без state_dir состояние не сохраняется.
+        # Файл другого интервала или старше state_max_age секунд игнорируется
+        self._state_file = (
+            Path(state_dir) / f".sma_state_{figi}_{fast}_{slow}.json" if state_dir is not None else None
+        )
+        self._state_interval = interval
+        self._state_max_age = state_max_age
+        self._save_every = max(1, save_every)
+        self._unsaved = 0
         
-        # DataFrame with columns: time, close
-        self.df = pd.DataFrame(columns=["time", "close"])
+        # Кольцевой буфер последних slow закрытий (в нано-единицах), общий для обоих
+        # окон; выделяется один раз на всё время жизни стратегии
+        self._closes = np.empty(slow, dtype=np.int64)
+        self._reset_windows()
         self.position_open: bool = False
         
         # Для отслеживания прибыли
@@ -35,6 +76,102 @@ class SmaCrossStrategy(Strategy):
         self.winning_trades: int = 0
         self.win_sum: float = 0.0  # Сумма выигрышей
 
+    def _reset_windows(self) -> None:
+        # _idx — куда писать следующее закрытие, _filled — сколько значений в буфере
+        self._idx = 0
+        self._filled = 0
+        self._slow_sum = 0
+        self._fast_sum = 0
+        # Знак (fast_ma - slow_ma) на последнем пересечении: +1, -1 или 0 до первого расчёта
+        self._prev_sign = 0
+        self._ready_count = 0
+
+    def _push_close(self, price: int) -> None:
+        """Пишет закрытие (в нано-единицах) в кольцевой буфер и сдвигает суммы обоих окон за O(1)."""
+        buf, idx = self._closes, self._idx
+        # Вытесняемое из окна закрытие вычитается из суммы до записи нового;
+        # отрицательный индекс для быстрого окна заворачивается на конец буфера
+        if self._filled >= self.fast:
+            self._fast_sum -= buf.item(idx - self.fast)
+        if self._filled == self.slow:
+            self._slow_sum -= buf.item(idx)
+        else:
+            self._filled += 1
+        buf[idx] = price
+        self._fast_sum += price
+        self._slow_sum += price
+
+        # Суммы целые и точные: пересчитывать их, чтобы не копилась ошибка, не нужно
+        idx += 1
+        self._idx = 0 if idx == self.slow else idx
+
+    def _ma_sign(self) -> int:
+        """Знак fast_ma - slow_ma: +1, -1 или 0 при точном равенстве средних."""
+        # Перекрёстное умножение вместо деления: int Python не переполняется
+        diff = self._fast_sum * self.slow - self._slow_sum * self.fast
+        return (diff > 0) - (diff < 0)
+
+    def _window(self) -> np.ndarray:
+        """Закрытия в буфере в хронологическом порядке."""
+        if self._filled < self.slow:
+            return self._closes[:self._filled]
+        return np.concatenate((self._closes[self._idx:], self._closes[:self._idx]))
+
+    def _load_window(self, closes: np.ndarray) -> None:
+        """Заполняет буфер последними slow закрытиями из closes (в хронологическом порядке)."""
+        tail = closes[-self.slow:]
+        filled = len(tail)
+        self._closes[:filled] = tail
+        self._filled = filled
+        self._idx = filled % self.slow
+        self._slow_sum = int(tail.sum())
+        self._fast_sum = int(tail[-self.fast:].sum())
+
+    def _save_state(self) -> None:
+        """Атомарно записывает окно закрытий и позицию в файл состояния."""
+        if self._state_file is None:
+            return
+        state = {name: getattr(self, name) for name in _STATE_FIELDS}
+        state["closes"] = self._window().tolist()
+        state["prev_sign"] = self._prev_sign
+        state["interval"] = self._state_interval
+        state["saved_at"] = time.time()
+        tmp = self._state_file.with_suffix(".tmp")
+        try:
+            tmp.write_bytes(json_dumps(state))
+            os.replace(tmp, self._state_file)
+        except OSError as e:
+            logger.warning("Failed to save strategy state to %s: %s", self._state_file, e)
+        self._unsaved = 0
+
+    def _load_state(self) -> None:
+        """Восстанавливает состояние, сохранённое _save_state, если файл есть."""
+        if self._state_file is None:
+            return
+        try:
+            state = json_loads(self._state_file.read_bytes())
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable strategy state %s: %s", self._state_file, e)
+            return
+        # Закрытия другого таймфрейма или давней сессии дали бы ложное пересечение
+        if state.get("interval") != self._state_interval:
+            logger.info("Ignoring strategy state %s saved for another interval", self._state_file)
+            return
+        age = time.time() - state.get("saved_at", 0.0)
+        if not 0 <= age <= self._state_max_age:
+            logger.info("Ignoring strategy state %s saved %.0f s ago", self._state_file, age)
+            return
+        # Прогон через _push_close заодно пересчитывает суммы обоих окон
+        for price in state.get("closes", ())[-self.slow:]:
+            self._push_close(int(price))
+        self._prev_sign = state.get("prev_sign", 0)
+        for name in _STATE_FIELDS:
+            if name in state:
+                setattr(self, name, state[name])
+        logger.info("Restored %d closes from %s", self._filled, self._state_file)
+
     # ------------------------------------------------------------------
     async def on_start(self) -> None:
         """Called when strategy is started."""
@@ -45,12 +182,14 @@ class SmaCrossStrategy(Strategy):
         self.winning_trades = 0
         self.win_sum = 0.0
         
-        # Очищаем историю, чтобы не было ложных сигналов от старых данных
-        self.df = pd.DataFrame(columns=["time", "close"])
+        # Очищаем историю, чтобы не было ложных сигналов от старых данных; свежий
+        # файл состояния того же интервала (только при state_dir) возвращает окно и позицию
+        self._reset_windows()
+        self._load_state()
         
         # Отправляем начальное состояние в UI
         if self.on_signal_callback:
-            self.on_signal_callback({
+            self._emit({
                 "type": "strategy_started",
                 "fast_sma": self.fast,
                 "slow_sma": self.slow,
@@ -59,9 +198,11 @@ class SmaCrossStrategy(Strategy):
 
     async def on_stop(self) -> None:
         """Called on graceful shutdown."""
+        self._save_state()
+        
         # Отправляем итоговую статистику в UI
         if self.on_signal_callback:
-            self.on_signal_callback({
+            self._emit({
                 "type": "strategy_stopped",
                 "total_profit": self.total_profit,
                 "trades_count": self.trades_count,
@@ -71,49 +212,119 @@ class SmaCrossStrategy(Strategy):
             })
 
     async def on_candle(self, candle):
-        price: Decimal = quotation_to_decimal(candle.close)
-        ts: datetime.datetime = candle.time
-        current_price = float(price)
-        self.df.loc[len(self.df)] = [ts, current_price]
+        # Все сигналы одной свечи уходят в UI вместе, после её обработки
+        with self.batch():
+            ts: datetime.datetime = candle.time
+            current_price = quotation_to_float(candle.close)
 
-        # Если недостаточно данных для расчета SMA, просто выходим
-        if len(self.df) < self.slow:
+            self._push_close(quotation_to_nano(candle.close))
+            if self._state_file is not None:
+                self._unsaved += 1
+                if self._unsaved >= self._save_every:
+                    self._save_state()
+
+            # Если недостаточно данных для расчета SMA, просто выходим
+            if self._filled < self.slow:
+                return
+
+            # Отправляем информацию об индикаторах в UI
+            if self.on_signal_callback is not None:
+                if self._ready_count % self._emit_every == 0:
+                    self._emit({
+                        "type": "indicators_update",
+                        "timestamp": ts,
+                        "price": current_price,
+                        # int / int в Python округляется один раз, точно
+                        "fast_ma": self._fast_sum / (self.fast * _NANO),
+                        "slow_ma": self._slow_sum / (self.slow * _NANO)
+                    })
+                self._ready_count += 1
+
+            # Crossover detection: реагируем только на смену знака, равенство пересечением не считается
+            sign = self._ma_sign()
+            if sign == 0 or sign == self._prev_sign:
+                return
+            await self._on_cross(sign, ts, current_price)
+
+    async def on_history(self, candles: Sequence[Any]) -> None:
+        """Прогоняет пачку исторических свечей, как цикл on_candle, но без цикла в Python.
+
+        Пересечения ищет один скан по закрытиям (numba или свёртки NumPy, см.
+        bot.core.sma); по свечам идём только в точках пересечения. Кольцевой
+        буфер после вызова такой же, как после on_candle, так что живой поток
+        продолжается без разрыва.
+        """
+        n = len(candles)
+        if n == 0:
             return
+        with self.batch():
+            new = np.fromiter((quotation_to_nano(c.close) for c in candles), dtype=np.int64, count=n)
+            # Уже накопленное окно продолжает историю: первые свечи пачки тоже могут дать SMA
+            window = self._window()
+            closes = np.concatenate((window, new))
+            start = len(window)
+            self._load_window(closes)
 
-        fast_ma = self.df.close.rolling(self.fast).mean().iloc[-1]
-        slow_ma = self.df.close.rolling(self.slow).mean().iloc[-1]
-        
-        # Отправляем информацию об индикаторах в UI
-        if self.on_signal_callback:
-            self.on_signal_callback({
-                "type": "indicators_update",
-                "timestamp": ts,
-                "price": current_price,
-                "fast_ma": fast_ma,
-                "slow_ma": slow_ma
-            })
+            if len(closes) < self.slow:
+                return
+            # Свеча готова, если для неё уже есть slow закрытий; first — индекс в closes
+            first = max(start, self.slow - 1)
+            ready = len(closes) - first
+
+            # Из indicators_update пачки в UI уходит только последний: ищем его свечу
+            last = -1
+            if self.on_signal_callback is not None:
+                last = len(closes) - 1 - (self._ready_count + ready - 1) % self._emit_every
+                self._ready_count += ready
+
+            indices, signs = crossovers(closes, self.fast, self.slow, first, self._prev_sign)
+            for i, sign in zip(indices.tolist(), signs.tolist()):
+                # Сигналы уходят в том же порядке, что и из цикла on_candle
+                if first <= last <= i:
+                    self._emit_indicators(candles[last - start], closes, last)
+                    last = -1
+                candle = candles[i - start]
+                await self._on_cross(sign, candle.time, quotation_to_float(candle.close))
+            if last >= first:
+                self._emit_indicators(candles[last - start], closes, last)
+            self._save_state()
 
-        # Crossover detection
-        if fast_ma > slow_ma and not self.position_open:
+    def _emit_indicators(self, candle, closes: np.ndarray, i: int) -> None:
+        """Шлёт indicators_update для свечи candle, чьё закрытие — closes[i], из on_history."""
+        self._emit({
+            "type": "indicators_update",
+            "timestamp": candle.time,
+            "price": quotation_to_float(candle.close),
+            "fast_ma": int(closes[i - self.fast + 1:i + 1].sum()) / (self.fast * _NANO),
+            "slow_ma": int(closes[i - self.slow + 1:i + 1].sum()) / (self.slow * _NANO)
+        })
+
+    async def _on_cross(self, sign: int, ts: datetime.datetime, current_price: float) -> None:
+        """Открывает или закрывает позицию на смене знака fast_ma - slow_ma."""
+        self._prev_sign = sign
+
+        if sign > 0 and not self.position_open:
             # Buy specified qty of lots
             await self.client.place_market_order(self.figi, qty=self.qty, direction="buy")
             self.position_open = True
             self.entry_price = current_price
-            
+            # Позиция сохраняется сразу, не дожидаясь очередных save_every свечей
+            self._save_state()
+        
             # Отправляем сигнал о входе в позицию
-            if self.on_signal_callback:
-                self.on_signal_callback({
+            if self.on_signal_callback is not None:
+                self._emit({
                     "type": "trade_entry",
                     "timestamp": ts,
                     "price": current_price,
                     "direction": "buy",
                     "qty": self.qty
                 })
-                
-        elif fast_ma < slow_ma and self.position_open:
+            
+        elif sign < 0 and self.position_open:
             # Sell position
             await self.client.place_market_order(self.figi, qty=self.qty, direction="sell")
-            
+        
             # Рассчитываем прибыль/убыток
             profit = (current_price - self.entry_price) * self.qty
             self.total_profit += profit
@@ -121,12 +332,13 @@ class SmaCrossStrategy(Strategy):
             if profit > 0:
                 self.winning_trades += 1
                 self.win_sum += profit
-                
-            self.position_open = False
             
+            self.position_open = False
+            self._save_state()
+        
             # Отправляем сигнал о выходе из позиции
-            if self.on_signal_callback:
-                self.on_signal_callback({
+            if self.on_signal_callback is not None:
+                self._emit({
                     "type": "trade_exit",
                     "timestamp": ts,
                     "price": current_price,
@@ -1,9 +1,11 @@
+import asyncio
 import logging
 from aiorun import run
 import argparse
+import importlib
 
 from bot.core.client import InvestClient
-from bot.strategies.echo import EchoStrategy
+from bot.core.pipeline import put_drop_oldest
 
 # Example FIGI for Sberbank (shares). Replace/extend if needed.
 DEFAULT_FIGI = "BBG004730N88"
@@ -14,17 +16,16 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# "module:Class" entry points; only the selected strategy is imported, after argparse
 STRATEGY_MAP = {
-    "echo": EchoStrategy,
+    "echo": "bot.strategies.echo:EchoStrategy",
+    "sma": "bot.strategies.sma_cross:SmaCrossStrategy",
 }
 
-try:
-    from bot.strategies.sma_cross import SmaCrossStrategy
 
-    STRATEGY_MAP["sma"] = SmaCrossStrategy
-except ImportError:
-    # Ignore if pandas not installed yet
-    pass
+def load_strategy(key: str):
+    module_name, class_name = STRATEGY_MAP[key].split(":")
+    return getattr(importlib.import_module(module_name), class_name)
 
 
 def parse_args():
@@ -37,14 +38,40 @@ def parse_args():
 async def run_bot() -> None:
     args = parse_args()
 
-    strategy_cls = STRATEGY_MAP[args.strategy]
+    strategy_cls = load_strategy(args.strategy)
 
     logger.info("Starting %s strategy on %s", strategy_cls.name, args.figi)
 
     async with InvestClient() as ic:
         strategy = strategy_cls(ic, args.figi)
-        async for candle in ic.stream_candles(figi=args.figi):
-            await strategy.on_candle(candle)
+        stream_mgr, candles = await ic.stream_candles(figi=args.figi)
+        # The stream reader never waits for the strategy: a bounded queue sits
+        # between them and drops the oldest candle when the strategy falls behind
+        queue: asyncio.Queue = asyncio.Queue(maxsize=64)
+
+        async def produce() -> None:
+            async for candle in candles:
+                put_drop_oldest(queue, candle)
+            # End-of-stream marker, so candles still queued are not lost: it waits
+            # for a free slot instead of evicting one (the consumer keeps draining)
+            await queue.put(None)
+
+        async def consume() -> None:
+            # Each candle goes to the strategy as soon as it is dequeued: no UI here
+            # to coalesce signals for, so batching would only delay orders
+            while (candle := await queue.get()) is not None:
+                await strategy.on_candle(candle)
+
+        producer = asyncio.create_task(produce())
+        consumer = asyncio.create_task(consume())
+        try:
+            done, _ = await asyncio.wait((producer, consumer), return_when=asyncio.FIRST_EXCEPTION)
+            for task in done:
+                task.result()
+        finally:
+            producer.cancel()
+            consumer.cancel()
+            stream_mgr.stop()
 
 
 def main():
@@ -0,0 +1,79 @@
+import json
+import sys
+from pathlib import Path
+
+# Ensure project root (one level up from /tests) is on sys.path for import resolution
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+import pytest
+
+import bot.config
+from bot.config import Settings, get_settings
+
+
+@pytest.fixture
+def project_root(tmp_path, monkeypatch):
+    """Point Settings at an empty temporary project root with clean caches."""
+    monkeypatch.setattr(bot.config, "PROJECT_ROOT", tmp_path)
+    Settings.invalidate()
+    get_settings.cache_clear()
+    yield tmp_path
+    Settings.invalidate()
+    get_settings.cache_clear()
+
+
+def test_labels_match_case_insensitively(project_root):
+    (project_root / "conf").write_text("sand-token Песочница\nprod-token PROD\n", encoding="utf-8")
+
+    settings = Settings()
+
+    assert settings.sandbox_token == "sand-token"
+    assert settings.production_token == "prod-token"
+
+
+def test_label_inside_another_word_is_ignored(project_root):
+    (project_root / "conf").write_text("wrong-token sandboxed\nprod-token prod\n", encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        Settings()
+
+
+def test_settings_json_token_skips_conf(project_root):
+    (project_root / "settings.json").write_text(
+        json.dumps({"sandbox_token": "json-token", "production_token": "json-prod"}), encoding="utf-8"
+    )
+
+    # No conf file exists: the fast path must not try to open it
+    settings = Settings()
+
+    assert settings.token == "json-token"
+    assert settings.production_token == "json-prod"
+
+
+def test_missing_conf_is_cached_until_invalidated(project_root):
+    conf = project_root / "conf"
+    with pytest.raises(FileNotFoundError):
+        Settings()
+
+    conf.write_text("late-token sandbox\n", encoding="utf-8")
+    # The miss is remembered, so the new file is not seen yet
+    with pytest.raises(FileNotFoundError):
+        Settings()
+
+    Settings.invalidate(conf)
+    assert Settings().sandbox_token == "late-token"
+
+
+def test_get_settings_is_shared_until_cache_clear(project_root):
+    conf = project_root / "conf"
+    conf.write_text("first-token песочница\n", encoding="utf-8")
+    first = get_settings()
+    assert get_settings() is first
+
+    conf.write_text("second-token песочница\n", encoding="utf-8")
+    assert get_settings().sandbox_token == "first-token"
+
+    get_settings.cache_clear()
+    assert get_settings().sandbox_token == "second-token"
@@ -0,0 +1,94 @@
+import asyncio
+import sys
+from pathlib import Path
+
+# Ensure project root (one level up from /tests) is on sys.path for import resolution
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+import pytest
+
+from bot.core.pipeline import AsyncBatcher, put_drop_oldest
+
+
+def test_put_drop_oldest_discards_oldest_when_full():
+    queue = asyncio.Queue(maxsize=3)
+    for item in range(5):
+        put_drop_oldest(queue, item)
+
+    assert [queue.get_nowait() for _ in range(queue.qsize())] == [2, 3, 4]
+
+
+@pytest.mark.asyncio
+async def test_batcher_takes_queued_items_without_waiting():
+    """Items already in the queue form one batch, cut at max_items."""
+    queue = asyncio.Queue()
+    for item in range(5):
+        queue.put_nowait(item)
+    batcher = AsyncBatcher(queue, max_items=3, timeout=10)
+
+    # A 10 s timeout would trip wait_for if the batcher suspended on a full batch
+    first = await asyncio.wait_for(batcher.__anext__(), 1)
+    assert first == [0, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_batcher_collects_late_items_until_timeout():
+    """Items arriving within *timeout* of the first join its batch; later ones do not."""
+    queue = asyncio.Queue()
+    batcher = AsyncBatcher(queue, max_items=10, timeout=0.2)
+
+    async def produce():
+        queue.put_nowait("a")
+        await asyncio.sleep(0.05)
+        queue.put_nowait("b")
+        await asyncio.sleep(0.4)
+        queue.put_nowait("c")
+
+    producer = asyncio.create_task(produce())
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    assert await batcher.__anext__() == ["a", "b"]
+    assert 0.15 <= loop.time() - started < 0.4
+    assert await batcher.__anext__() == ["c"]
+    await producer
+
+
+@pytest.mark.asyncio
+async def test_batcher_returns_full_batch_before_timeout():
+    queue = asyncio.Queue()
+    batcher = AsyncBatcher(queue, max_items=2, timeout=10)
+
+    async def produce():
+        for item in range(3):
+            await asyncio.sleep(0.01)
+            queue.put_nowait(item)
+
+    producer = asyncio.create_task(produce())
+    assert await asyncio.wait_for(batcher.__anext__(), 1) == [0, 1]
+    await producer
+
+
+@pytest.mark.asyncio
+async def test_default_batcher_returns_lone_item_at_once():
+    """By default a single queued item is returned without any timeout wait."""
+    queue = asyncio.Queue()
+    batcher = AsyncBatcher(queue)
+    queue.put_nowait("only")
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    assert await batcher.__anext__() == ["only"]
+    assert loop.time() - started < 0.05
+
+
+@pytest.mark.asyncio
+async def test_default_batcher_groups_items_already_queued():
+    queue = asyncio.Queue()
+    batcher = AsyncBatcher(queue, max_items=4)
+    for item in range(6):
+        queue.put_nowait(item)
+
+    assert await batcher.__anext__() == [0, 1, 2, 3]
+    assert await batcher.__anext__() == [4, 5]
@@ -0,0 +1,45 @@
+import os
+import sys
+from pathlib import Path
+
+# Ensure project root (one level up from /tests) is on sys.path for import resolution
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+import pytest
+
+pytest.importorskip("PyQt6")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication
+
+import bot.config
+import bot.gui.settings
+from bot.config import Settings, get_settings
+from bot.gui.settings import SettingsPanel
+
+
+@pytest.fixture
+def project_root(tmp_path, monkeypatch):
+    """Point both Settings and SettingsPanel at an empty temporary project root."""
+    monkeypatch.setattr(bot.config, "PROJECT_ROOT", tmp_path)
+    monkeypatch.setattr(bot.gui.settings, "PROJECT_ROOT", tmp_path)
+    Settings.invalidate()
+    get_settings.cache_clear()
+    yield tmp_path
+    Settings.invalidate()
+    get_settings.cache_clear()
+
+
+def test_panel_opens_with_unreadable_conf(project_root):
+    """An OSError other than FileNotFoundError while reading conf leaves the token field empty."""
+    # A directory in place of the file: opening it raises IsADirectoryError (even as root)
+    (project_root / "conf").mkdir()
+    app = QApplication.instance() or QApplication([])
+
+    panel = SettingsPanel()
+
+    assert panel.sandbox_token_edit.text() == ""
+    panel.deleteLater()
+    app.processEvents()
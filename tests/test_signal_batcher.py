@@ -0,0 +1,63 @@
+import sys
+from pathlib import Path
+
+# Ensure project root (one level up from /tests) is on sys.path for import resolution
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+import pytest
+
+from bot.strategies.base import SignalBatcher, Strategy
+
+
+class StubStrategy(SignalBatcher, Strategy):
+    """Emits one indicators update per candle and a trade signal on odd candles."""
+
+    def __init__(self, received: list):
+        super().__init__(client=None, figi="FIGI")
+        self.on_signal_callback = received.append
+
+    async def on_candle(self, candle):
+        with self.batch():
+            self._emit({"type": "indicators_update", "value": candle})
+            if candle % 2:
+                self._emit({"type": "trade_entry", "price": candle})
+
+
+def test_emit_outside_batch_is_immediate():
+    received = []
+    strategy = StubStrategy(received)
+
+    strategy._emit({"type": "indicators_update", "value": 1})
+    strategy._emit({"type": "indicators_update", "value": 2})
+
+    assert [s["value"] for s in received] == [1, 2]
+
+
+def test_nested_batches_flush_at_outermost_exit():
+    received = []
+    strategy = StubStrategy(received)
+
+    with strategy.batch():
+        with strategy.batch():
+            strategy._emit({"type": "trade_entry", "price": 1})
+        assert received == []
+        strategy._emit({"type": "trade_exit", "price": 2})
+        assert received == []
+
+    assert [s["type"] for s in received] == ["trade_entry", "trade_exit"]
+
+
+@pytest.mark.asyncio
+async def test_on_candles_keeps_last_indicator_and_every_trade_in_order():
+    received = []
+    strategy = StubStrategy(received)
+
+    await strategy.on_candles([1, 2, 3, 4])
+
+    assert received == [
+        {"type": "trade_entry", "price": 1},
+        {"type": "trade_entry", "price": 3},
+        {"type": "indicators_update", "value": 4},
+    ]
@@ -0,0 +1,112 @@
+import sys
+from pathlib import Path
+
+# Ensure project root (one level up from /tests) is on sys.path for import resolution
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+import collections
+import datetime
+import math
+import os
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from bot.core import sma
+
+NANO = 1_000_000_000
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_scan_variants_agree(seed):
+    """crossovers (numba when installed), plain-Python _scan and _scan_numpy must agree."""
+    rng = np.random.default_rng(seed)
+    fast = int(rng.integers(2, 15))
+    slow = int(rng.integers(fast + 1, 40))
+    n = int(rng.integers(slow, 800))
+    # 2-decimal random walk around a price level from 1 to 10 million, in nano-units
+    level = int(rng.choice([1, 100, 5_000, 10_000_000]))
+    steps = rng.choice([-3, -1, 0, 1, 2], size=n) * (NANO // 100)
+    closes = np.maximum(level * NANO + np.cumsum(steps), NANO // 100).astype(np.int64)
+    first = int(rng.integers(slow - 1, n))
+    prev_sign = int(rng.choice([-1, 0, 1]))
+
+    expected = sma._scan_numpy(closes, fast, slow, first, prev_sign)
+    for scan in (sma.crossovers, sma._scan):
+        indices, signs = scan(closes, fast, slow, first, prev_sign)
+        assert indices.tolist() == expected[0].tolist()
+        assert signs.tolist() == expected[1].tolist()
+
+
+def test_equal_averages_are_not_a_cross():
+    closes = np.full(20, 100 * NANO, dtype=np.int64)
+    for scan in (sma.crossovers, sma._scan_numpy):
+        indices, signs = scan(closes, 3, 5, 4, 0)
+        assert indices.size == 0 and signs.size == 0
+
+
+def incremental_sma(closes, period):
+    """Reference: the chart's deque-based running sum, one close at a time."""
+    window = collections.deque(maxlen=period)
+    total = 0.0
+    out = []
+    for close in closes:
+        if len(window) == period:
+            total -= window[0]
+        window.append(close)
+        total += close
+        out.append(total / period if len(window) == period else math.nan)
+    return out
+
+
+@pytest.mark.parametrize("period", [1, 5, 20])
+def test_bulk_sma_matches_incremental(period):
+    rng = np.random.default_rng(period)
+    closes = np.round(100 + np.cumsum(rng.normal(0, 0.5, 500)), 2)
+    expected = incremental_sma(closes.tolist(), period)
+
+    for sums in (sma.rolling_sums, sma._rolling_sums, sma._rolling_sums_numpy):
+        result = sums(closes, period) / period
+        np.testing.assert_allclose(result, expected, rtol=1e-12, equal_nan=True)
+    np.testing.assert_allclose(sma.bulk_sma(closes, period), expected, rtol=1e-12, equal_nan=True)
+
+
+def test_bulk_sma_shorter_than_period_is_all_nan():
+    assert np.isnan(sma.bulk_sma(np.arange(3.0), 5)).all()
+
+
+def test_chart_history_sma_matches_live_updates():
+    """ModernChart.load_history (bulk SMA) must leave the same SMA as feeding candles one by one."""
+    pytest.importorskip("PyQt6")
+    pytest.importorskip("pyqtgraph")
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtWidgets import QApplication
+    from bot.gui.chart import ModernChart
+
+    app = QApplication.instance() or QApplication([])
+    t0 = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+    rng = np.random.default_rng(7)
+    closes = np.round(100 + np.cumsum(rng.normal(0, 0.5, 300)), 2)
+
+    def quotation(value):
+        units = int(value)
+        return SimpleNamespace(units=units, nano=round((value - units) * NANO))
+
+    candles = [
+        SimpleNamespace(time=t0 + datetime.timedelta(minutes=i), open=quotation(c), high=quotation(c),
+                        low=quotation(c), close=quotation(c), volume=1)
+        for i, c in enumerate(closes.tolist())
+    ]
+    live, bulk = ModernChart("FIGI", max_bars=100, sma_period=20), ModernChart("FIGI", max_bars=100, sma_period=20)
+    live.update_data_batch(candles[:250])
+    bulk.load_history(candles[:250])
+    # Live candles after the history continue the same running window
+    for chart in (live, bulk):
+        chart.update_data_batch(candles[250:])
+
+    np.testing.assert_allclose(bulk._sma_values, live._sma_values, rtol=1e-12, equal_nan=True)
+    assert len(bulk._sma_values) == 100
+    app.processEvents()
@@ -0,0 +1,169 @@
+import datetime
+import random
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# Ensure project root (one level up from /tests) is on sys.path for import resolution
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+import pytest
+
+from bot.strategies.sma_cross import SmaCrossStrategy
+
+T0 = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+class FakeClient:
+    """Records orders instead of sending them to the sandbox."""
+
+    def __init__(self):
+        self.orders = []
+
+    async def place_market_order(self, figi: str, qty: int, direction: str) -> None:
+        self.orders.append(direction)
+
+
+def make_candle(i: int, close: float):
+    units = int(close)
+    return SimpleNamespace(
+        close=SimpleNamespace(units=units, nano=round((close - units) * 1_000_000_000)),
+        time=T0 + datetime.timedelta(minutes=i),
+    )
+
+
+def sma(values, period):
+    return sum(values[-period:]) / period
+
+
+@pytest.mark.asyncio
+async def test_moving_averages_match_naive_mean():
+    """Running ring-buffer sums must agree with a plain mean over the window."""
+    closes = [100 + (i * 7 % 13) + 0.25 * (i % 4) for i in range(120)]
+    signals = []
+    strategy = SmaCrossStrategy(FakeClient(), "FIGI", fast=3, slow=7, on_signal_callback=signals.append)
+    await strategy.on_start()
+
+    for i, close in enumerate(closes):
+        await strategy.on_candle(make_candle(i, close))
+
+    updates = [s for s in signals if s["type"] == "indicators_update"]
+    assert len(updates) == len(closes) - 7 + 1
+    for k, update in enumerate(updates):
+        window = closes[: 7 + k]
+        assert update["fast_ma"] == pytest.approx(sma(window, 3))
+        assert update["slow_ma"] == pytest.approx(sma(window, 7))
+
+
+@pytest.mark.asyncio
+async def test_trades_on_crossover_edges_only():
+    """Buy when fast crosses above slow, sell when it crosses back below."""
+    closes = [10, 10, 10, 11, 12, 13, 14, 13, 12, 11, 10, 9, 8, 9, 10, 11, 12]
+    client = FakeClient()
+    strategy = SmaCrossStrategy(client, "FIGI", fast=2, slow=4)
+    await strategy.on_start()
+
+    for i, close in enumerate(closes):
+        await strategy.on_candle(make_candle(i, close))
+
+    assert client.orders == ["buy", "sell", "buy"]
+    assert strategy.position_open
+    assert strategy.trades_count == 1
+
+
+@pytest.mark.asyncio
+async def test_state_file_restores_window_and_position(tmp_path):
+    """A restarted strategy resumes from the saved window without a warm-up."""
+    closes = [10, 10, 10, 11, 12, 13, 14]
+    first = SmaCrossStrategy(FakeClient(), "FIGI", fast=2, slow=4, state_dir=tmp_path, interval="1m")
+    await first.on_start()
+    for i, close in enumerate(closes):
+        await first.on_candle(make_candle(i, close))
+    await first.on_stop()
+
+    signals = []
+    second = SmaCrossStrategy(FakeClient(), "FIGI", fast=2, slow=4, state_dir=tmp_path, interval="1m",
+                              on_signal_callback=signals.append)
+    await second.on_start()
+    await second.on_candle(make_candle(len(closes), 15))
+
+    assert second.position_open and second.entry_price == first.entry_price
+    assert second.total_profit == 0 and second.trades_count == 0
+    update = next(s for s in signals if s["type"] == "indicators_update")
+    assert update["fast_ma"] == pytest.approx(sma(closes + [15], 2))
+    assert update["slow_ma"] == pytest.approx(sma(closes + [15], 4))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("interval, max_age", [("5m", 3600.0), ("1m", -1.0)])
+async def test_state_file_ignored_for_other_interval_or_when_stale(tmp_path, interval, max_age):
+    first = SmaCrossStrategy(FakeClient(), "FIGI", fast=2, slow=4, state_dir=tmp_path, interval="1m")
+    await first.on_start()
+    for i, close in enumerate([10, 10, 10, 11, 12, 13, 14]):
+        await first.on_candle(make_candle(i, close))
+    await first.on_stop()
+
+    second = SmaCrossStrategy(FakeClient(), "FIGI", fast=2, slow=4, state_dir=tmp_path,
+                              interval=interval, state_max_age=max_age)
+    await second.on_start()
+
+    assert not second.position_open
+    assert second._filled == 0
+
+
+@pytest.mark.asyncio
+async def test_history_matches_candle_loop():
+    """on_history must trade and leave the window exactly as the on_candle loop does."""
+    closes = [100 + (i * 5 % 17) - 0.5 * (i % 3) for i in range(200)]
+    candles = [make_candle(i, close) for i, close in enumerate(closes)]
+    results = []
+    for bulk in (False, True):
+        client = FakeClient()
+        strategy = SmaCrossStrategy(client, "FIGI", fast=3, slow=8)
+        await strategy.on_start()
+        # A few live candles first, so the history continues a partly filled window
+        for candle in candles[:5]:
+            await strategy.on_candle(candle)
+        if bulk:
+            await strategy.on_history(candles[5:])
+        else:
+            for candle in candles[5:]:
+                await strategy.on_candle(candle)
+        results.append((client.orders, strategy.total_profit, strategy._window().tolist()))
+
+    assert results[0][0]
+    assert results[1] == results[0]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("seed", range(40))
+async def test_history_matches_candle_loop_on_random_walks(seed):
+    """Parity on 2-decimal random walks, where fast_ma == slow_ma ties are common."""
+    rng = random.Random(seed)
+    fast = rng.randint(2, 12)
+    slow = rng.randint(fast + 1, 30)
+    price = 100.0
+    closes = []
+    for _ in range(rng.randint(slow, 400)):
+        price = round(price + rng.choice([-0.03, -0.01, 0.0, 0.01, 0.02]), 2)
+        closes.append(price)
+    candles = [make_candle(i, close) for i, close in enumerate(closes)]
+    split = rng.randint(0, len(candles))
+
+    results = []
+    for bulk in (False, True):
+        client = FakeClient()
+        strategy = SmaCrossStrategy(client, "FIGI", fast=fast, slow=slow)
+        await strategy.on_start()
+        for candle in candles[:split]:
+            await strategy.on_candle(candle)
+        if bulk:
+            await strategy.on_history(candles[split:])
+        else:
+            for candle in candles[split:]:
+                await strategy.on_candle(candle)
+        results.append((client.orders, strategy.total_profit, strategy._window().tolist()))
+
+    assert results[1] == results[0]